@@ -0,0 +1,124 @@
+"""
+Gemini による 6W3H 分析・スライド構成案の作成（app.py / server.py 共通）。
+
+モデルのバックエンドは環境変数 SLIDE_MODEL_BACKEND で切り替える。
+    gemini: Gemini API（既定）
+    stub:   API を呼ばずに固定の構成案を返す（オフライン動作・テスト用）
+"""
+import json
+import os
+import re
+from functools import lru_cache
+
+
+def build_prompt(topic, overview, count_str):
+    """
+    1. 6W3H Analysis
+    2. JSON Structure Proposal
+    """
+    if "Auto" in count_str:
+        num_instruction = "最適なボックス数（4〜8個）を提案してください。"
+    else:
+        num = int(count_str.split("個")[0])
+        num_instruction = f"必ず【{num}個】のボックス（セクション）で構成してください。"
+
+    return f"""
+    あなたは優秀な行政コンサルタント兼資料作成のプロです。
+    ユーザーの依頼に基づき、「A3・1枚スライド」の構成案を作成します。
+
+    【依頼内容】
+    テーマ: {topic}
+    概要・補足: {overview}
+
+    【タスク1: 6W3H分析】
+    この資料の方向性を定めるため、以下を分析してください。
+    - Who（主体）, Whom（ターゲット）, When（時期）, Where（対象範囲）, Why（目的）, What（内容）
+    - How（手段）, How much（予算）, How many（規模）
+
+    【タスク2: 構成案の作成】
+    分析に基づき、スライドの構成（JSON）を作成してください。
+    レイアウト要件:
+    - 左右2カラム構成（左：現状・課題など / 右：解決策・未来など）。
+    - {num_instruction}
+    - 各ボックスには「タイトル（label）」と「内容の箇条書きドラフト（text）」を含めます。
+
+    【重要な指示：視覚的要素の強化】
+    1. **見出しへのアイコン付与**: 各見出し（label）の先頭に、内容を表す適切な「絵文字」を必ず1つ追加してください。（例: "💡 提案", "⚠️ 課題", "📉 現状"）
+    2. **図解パターンの指定**: 内容が「手順」「ステップ」「時系列」の場合は、`layout_type`を `"flow_horizontal"` に指定してください。通常の箇条書きは `"text"` とします。
+
+    【出力フォーマット】
+    以下のJSON形式のみを出力してください（Markdownコードブロックで囲んでください）。
+    {{
+        "analysis": "6W3H分析の要約（200文字以内）...",
+        "theme": "提案するスライドのタイトル（より魅力的で行政文書として適切なもの）",
+        "department": "担当部署名（推定）",
+        "content": [
+            {{ "column": "left", "label": "📉 01. 背景", "text": "・...", "layout_type": "text" }},
+            {{ "column": "left", "label": "⚠️ 02. 課題", "text": "・...", "layout_type": "text" }},
+            ...
+            {{ "column": "right", "label": "🚀 05. 施策", "text": "Step1: ...", "layout_type": "flow_horizontal" }},
+            ...
+        ]
+    }}
+    """
+
+
+def extract_json(txt):
+    """モデル応答からJSON部分を取り出して読み込む。"""
+    json_str = txt
+    if "```json" in txt:
+        json_str = txt.split("```json")[1].split("```")[0]
+    elif "{" in txt:
+        start = txt.find("{")
+        end = txt.rfind("}") + 1
+        json_str = txt[start:end]
+    return json.loads(json_str)
+
+
+def dummy_structure(topic):
+    """API未接続時のダミー構成案。"""
+    return {
+        "analysis": "API未接続のためダミー分析を表示します。ターゲットは庁内決裁者、目的は予算承認と仮定します。",
+        "theme": topic,
+        "department": "未設定部局",
+        "content": [
+            {"column": "left", "label": "01. 背景", "text": "・ダミーテキスト\n・APIキーを設定してください"},
+            {"column": "left", "label": "02. 課題", "text": "・自動生成機能が使えません"},
+            {"column": "right", "label": "03. 対策", "text": "・サイドバーからKeyを入力"},
+            {"column": "right", "label": "04. 効果", "text": "・AIによる素晴らしい体験"}
+        ]
+    }
+
+
+class _StubResponse:
+    def __init__(self, text):
+        self.text = text
+
+
+class StubModel:
+    """genai.GenerativeModel と同じ呼び出し方で、固定の構成案を返すスタブ。"""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+
+    def generate_content(self, prompt):
+        match = re.search(r"テーマ: (.*)", prompt)
+        topic = match.group(1).strip() if match else "Untitled"
+        return _StubResponse("```json\n" + json.dumps(dummy_structure(topic), ensure_ascii=False) + "\n```")
+
+
+@lru_cache(maxsize=16)
+def get_model(model_name, backend=None):
+    """モデルクライアントを返す。同じモデル名では同じインスタンス（接続）を再利用する（最大16件）。"""
+    backend = backend or os.environ.get("SLIDE_MODEL_BACKEND", "gemini")
+    if backend == "stub":
+        return StubModel(model_name)
+    import google.generativeai as genai
+    return genai.GenerativeModel(model_name)
+
+
+def analyze_and_structure(topic, overview, count_str, model_name, backend=None):
+    """6W3H分析を行い、スライド構成案（dict）を返す。失敗時は例外を送出する。"""
+    prompt = build_prompt(topic, overview, count_str)
+    response = get_model(model_name, backend).generate_content(prompt)
+    return extract_json(response.text)
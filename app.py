@@ -1,8 +1,10 @@
 import streamlit as st
-import json
 import os
 import google.generativeai as genai
 from generate_slide import create_a3_slide
+from slide_model import SlideDoc
+from project_store import ProjectStore
+import ai_structure
 import time
 
 # --- Page Config ---
@@ -11,7 +13,9 @@ st.set_page_config(layout="wide", page_title="1-Paper Slide Generator", initial_
 # --- Session State Restoration & Init ---
 keys_to_init = {
     "step": 1,  # 1: Setup, 2: Proposal/Edit, 3: Generation
-    "slide_json": {},
+    "slide_doc": None,  # SlideDoc (STEP 2 で編集するスライド構成)
+    "project_id": None,  # ProjectStore に保存中の下書きID (URL の ?project= と同じ)
+    "my_projects": [],  # このセッションで作成・オープンした下書きID（一覧に出すのはこれだけ）
     "genai_models": ["gemini-1.5-flash", "gemini-1.5-pro"],
     "api_ok": False,
     "theme_mode": "Dark",   # Default Dark
@@ -25,6 +29,32 @@ for k, v in keys_to_init.items():
     if k not in st.session_state:
         st.session_state[k] = v
 
+# --- Draft Store (ページ再読み込み・再起動後も下書きを復元) ---
+@st.cache_resource
+def get_project_store():
+    store = ProjectStore()
+    store.start_compactor()
+    return store
+
+def restore_project(project_id):
+    doc = get_project_store().load(project_id)
+    if doc is None:
+        return False
+    st.session_state.slide_doc = doc
+    st.session_state.project_id = project_id
+    st.session_state.step = 2
+    st.query_params["project"] = project_id
+    remember_project(project_id)
+    return True
+
+def remember_project(project_id):
+    # 公開アプリで DB を共有するため、他の利用者の下書きは一覧に出さない
+    if project_id not in st.session_state.my_projects:
+        st.session_state.my_projects.append(project_id)
+
+if st.session_state.slide_doc is None and "project" in st.query_params:
+    restore_project(st.query_params["project"])
+
 # --- Theme & Styling ---
 def apply_theme():
     is_dark = st.session_state.theme_mode == "Dark"
@@ -109,6 +139,7 @@ with st.sidebar:
         else:
             try:
                 genai.configure(api_key=api_key)
+                ai_structure.get_model.cache_clear() # 新しいキーで接続し直す
                 models = []
                 for m in genai.list_models():
                     if 'generateContent' in m.supported_generation_methods:
@@ -135,78 +166,38 @@ with st.sidebar:
         st.info("API未接続: ダミーモードまたは制限モードで動作します")
         if api_key: genai.configure(api_key=api_key) # Try to configure anyway if key exists
 
+    st.markdown("---")
+
+    # Saved Drafts
+    recent = get_project_store().recent(st.session_state.my_projects)
+    if recent:
+        draft = st.selectbox("保存済みの下書き (Drafts)", recent,
+                             format_func=lambda r: f"{r[1] or 'Untitled'} ({time.strftime('%m/%d %H:%M', time.localtime(r[2]))})")
+        if st.button("下書きを開く (Restore)"):
+            restore_project(draft[0])
+            st.rerun()
+
 # --- Helper: AI Logic ---
 def analyze_and_structure(topic, overview, count_str, model_name):
     """
     1. 6W3H Analysis
     2. JSON Structure Proposal
     """
-    if "Auto" in count_str:
-        num_instruction = "最適なボックス数（4〜8個）を提案してください。"
-    else:
-        num = int(count_str.split("個")[0])
-        num_instruction = f"必ず【{num}個】のボックス（セクション）で構成してください。"
-
-    prompt = f"""
-    あなたは優秀な行政コンサルタント兼資料作成のプロです。
-    ユーザーの依頼に基づき、「A3・1枚スライド」の構成案を作成します。
-
-    【依頼内容】
-    テーマ: {topic}
-    概要・補足: {overview}
-    
-    【タスク1: 6W3H分析】
-    この資料の方向性を定めるため、以下を分析してください。
-    - Who（主体）, Whom（ターゲット）, When（時期）, Where（対象範囲）, Why（目的）, What（内容）
-    - How（手段）, How much（予算）, How many（規模）
-    
-    【タスク2: 構成案の作成】
-    分析に基づき、スライドの構成（JSON）を作成してください。
-    レイアウト要件:
-    - 左右2カラム構成（左：現状・課題など / 右：解決策・未来など）。
-    - {num_instruction}
-    - 各ボックスには「タイトル（label）」と「内容の箇条書きドラフト（text）」を含めます。
-    
-    【重要な指示：視覚的要素の強化】
-    1. **見出しへのアイコン付与**: 各見出し（label）の先頭に、内容を表す適切な「絵文字」を必ず1つ追加してください。（例: "💡 提案", "⚠️ 課題", "📉 現状"）
-    2. **図解パターンの指定**: 内容が「手順」「ステップ」「時系列」の場合は、`layout_type`を `"flow_horizontal"` に指定してください。通常の箇条書きは `"text"` とします。
-
-    【出力フォーマット】
-    以下のJSON形式のみを出力してください（Markdownコードブロックで囲んでください）。
-    {{
-        "analysis": "6W3H分析の要約（200文字以内）...",
-        "theme": "提案するスライドのタイトル（より魅力的で行政文書として適切なもの）",
-        "department": "担当部署名（推定）",
-        "content": [
-            {{ "column": "left", "label": "📉 01. 背景", "text": "・...", "layout_type": "text" }},
-            {{ "column": "left", "label": "⚠️ 02. 課題", "text": "・...", "layout_type": "text" }},
-            ...
-            {{ "column": "right", "label": "🚀 05. 施策", "text": "Step1: ...", "layout_type": "flow_horizontal" }},
-            ...
-        ]
-    }}
-    """
-    
     try:
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
-        txt = response.text
-        
-        # Extract JSON
-        json_str = txt
-        if "```json" in txt:
-            json_str = txt.split("```json")[1].split("```")[0]
-        elif "{" in txt:
-            start = txt.find("{")
-            end = txt.rfind("}") + 1
-            json_str = txt[start:end]
-            
-        data = json.loads(json_str)
-        return data
+        return ai_structure.analyze_and_structure(topic, overview, count_str, model_name)
     except Exception as e:
         st.error(f"AI生成エラー: {e}")
         return None
 
+# --- Helper: Rendering ---
+@st.cache_data(max_entries=32, show_spinner=False)
+def render_pptx(digest, _doc):
+    """SlideDoc を PPTX バイト列に変換する（同じ内容 = 同じ digest は再生成しない）。"""
+    output_path = "output_slide.pptx"
+    create_a3_slide(_doc, output_path)
+    with open(output_path, "rb") as f:
+        return f.read()
+
 # --- Main Layout ---
 
 st.title("1ペーパー説明スライド生成 Ver.1.0")
@@ -254,20 +245,13 @@ if st.session_state.step == 1:
                     )
                 else:
                     time.sleep(2) # Fake wait
-                    res = {
-                        "analysis": "API未接続のためダミー分析を表示します。ターゲットは庁内決裁者、目的は予算承認と仮定します。",
-                        "theme": st.session_state.topic,
-                        "department": "未設定部局",
-                        "content": [
-                            {"column": "left", "label": "01. 背景", "text": "・ダミーテキスト\n・APIキーを設定してください"},
-                            {"column": "left", "label": "02. 課題", "text": "・自動生成機能が使えません"},
-                            {"column": "right", "label": "03. 対策", "text": "・サイドバーからKeyを入力"},
-                            {"column": "right", "label": "04. 効果", "text": "・AIによる素晴らしい体験"}
-                        ]
-                    }
+                    res = ai_structure.dummy_structure(st.session_state.topic)
                 
                 if res:
-                    st.session_state.slide_json = res
+                    st.session_state.slide_doc = SlideDoc.from_json(res)
+                    st.session_state.project_id = get_project_store().create(st.session_state.slide_doc)
+                    st.query_params["project"] = st.session_state.project_id
+                    remember_project(st.session_state.project_id)
                     st.session_state.step = 2
                     st.rerun()
         
@@ -281,75 +265,55 @@ elif st.session_state.step == 2:
         # Header Area
         st.button("← 戻る (Back)", on_click=lambda: st.session_state.update({"step": 1}))
         
+        doc = st.session_state.slide_doc
+
         # Analysis Result Display
-        if "analysis" in st.session_state.slide_json:
-            st.info(f"📊 **AI Analysis (6W3H)**: {st.session_state.slide_json['analysis']}")
+        if doc.analysis:
+            st.info(f"📊 **AI Analysis (6W3H)**: {doc.analysis}")
 
         # Meta Info
         c1, c2 = st.columns(2)
         with c1:
-            new_theme = st.text_input("タイトル案", value=st.session_state.slide_json.get("theme", ""))
-            st.session_state.slide_json["theme"] = new_theme
+            new_theme = st.text_input("タイトル案", value=doc.theme)
         with c2:
-            new_dept = st.text_input("部局名", value=st.session_state.slide_json.get("department", ""))
-            st.session_state.slide_json["department"] = new_dept
+            new_dept = st.text_input("部局名", value=doc.department)
+        doc = doc.update(theme=new_theme, department=new_dept)
 
         st.divider()
 
         # Dynamic Columns Editor
-        content_items = st.session_state.slide_json.get("content", [])
-        
-        # Sort/Filter for display
-        left_items = [item for item in content_items if item.get("column") == "left"]
-        right_items = [item for item in content_items if item.get("column") == "right"]
-        if not left_items and not right_items:
-            # Fallback for old format or unexpected json
-            left_items = content_items[:len(content_items)//2]
-            right_items = content_items[len(content_items)//2:]
-
+        # (左右の振り分けは SlideDoc 生成時に計算済み。変更のあったボックスだけ差し替える)
         col_l, col_r = st.columns(2)
-        
-        with col_l:
-            st.subheader("Left Column (Why/What)")
-            for i, item in enumerate(left_items):
-                with st.expander(f"{item.get('label', 'Section')}", expanded=True):
-                    item["label"] = st.text_input(f"見出し #{i+1}L", value=item.get("label", ""))
-                    item["text"] = st.text_area(f"内容 #{i+1}L", value=item.get("text", ""), height=120)
-
-        with col_r:
-            st.subheader("Right Column (How/Future)")
-            for i, item in enumerate(right_items):
-                with st.expander(f"{item.get('label', 'Section')}", expanded=True):
-                    item["label"] = st.text_input(f"見出し #{i+1}R", value=item.get("label", ""))
-                    item["text"] = st.text_area(f"内容 #{i+1}R", value=item.get("text", ""), height=120)
+        editor_columns = [
+            (col_l, "left", "L", "Left Column (Why/What)"),
+            (col_r, "right", "R", "Right Column (How/Future)"),
+        ]
+        for container, column, suffix, title in editor_columns:
+            with container:
+                st.subheader(title)
+                for i, item in enumerate(doc.column(column)):
+                    with st.expander(f"{item.label or 'Section'}", expanded=True):
+                        label = st.text_input(f"見出し #{i+1}{suffix}", value=item.label)
+                        text = st.text_area(f"内容 #{i+1}{suffix}", value=item.text, height=120)
+                    doc = doc.update_item(column, i, label=label, text=text)
 
-        # Re-save to session
-        # (References in list are mutable, so st.session_state.slide_json is already updated,
-        # but explicit re-assignment ensures Streamlit catches it if needed)
+        # Re-save to session (変更がなければ同じオブジェクトのまま)
+        # 変更があった場合は、変更されたボックスだけを下書きに追記する
+        if doc is not st.session_state.slide_doc and st.session_state.project_id:
+            get_project_store().save(st.session_state.project_id, doc)
+        st.session_state.slide_doc = doc
         
         st.markdown("<br><br>", unsafe_allow_html=True)
         if st.button("✨ スライドを生成する (Generate PPTX)", type="primary", use_container_width=True):
             with st.spinner("PowerPointをレンダリング中..."):
                 try:
-                    # Convert list-based content back to dict if generate_slide expects it?
-                    # Actually, I should update generate_slide to handle this list format OR 
-                    # create a temporary adapter.
-                    # For now, let's keep the JSON structure clean as a dict for legacy compat OR list.
-                    # Wait, the PLAN said "Dynamic inputs". The existing generate_slide expects specific keys (box1...).
-                    # I MUST UPDATE generate_slide.py to handle this new list-based dynamic JSON.
-                    # For this step, I will assume generate_slide will be updated next.
-                    
                     from datetime import datetime
                     today_str = datetime.now().strftime("%Y%m%d")
-                    safe_title = st.session_state.slide_json.get("theme", "Untitled").replace(" ", "_").replace("/", "-")
-                    output_path = "output_slide.pptx"
+                    safe_title = doc.theme.replace(" ", "_").replace("/", "-")
                     download_filename = f"{today_str}_{safe_title}.pptx"
                     
-                    create_a3_slide(st.session_state.slide_json, output_path)
-                    
-                    with open(output_path, "rb") as f:
-                        st.session_state.ppt_buffer = f.read()
-                        st.session_state.download_filename = download_filename # Store for button
+                    st.session_state.ppt_buffer = render_pptx(doc.digest, doc)
+                    st.session_state.download_filename = download_filename # Store for button
                     
                     st.session_state.step = 3
                     st.rerun()
@@ -377,6 +341,8 @@ elif st.session_state.step == 3:
     st.markdown("<br>", unsafe_allow_html=True)
     if st.button("最初に戻る (Create Another)"):
         st.session_state.step = 1
-        st.session_state.slide_json = {}
+        st.session_state.slide_doc = None
+        st.session_state.project_id = None
+        st.query_params.clear()
         st.rerun()
     st.markdown('</div>', unsafe_allow_html=True)
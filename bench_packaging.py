@@ -0,0 +1,63 @@
+"""
+PPTX 保存時の zip 圧縮方式によるサイズ・時間の比較。
+
+典型的な A3・1枚スライド（verify_diagrams.py と同程度の内容）を描画し、
+保存方式ごとに平均保存時間とファイルサイズを表示する。
+計測するのは1デッキの zip 圧縮方式だけで、デッキをまたいだ同一パーツの重複排除は含まない
+（現在のスライドは図形とテキストのみで画像パーツを持たない。stream_slides.py の重複検出は
+同一内容のデッキの描画結果を再利用するだけで、書き出しは各デッキ全体を行う）。
+
+    python bench_packaging.py [-n 50]
+"""
+import argparse
+import io
+import time
+
+from generate_slide import build_a3_presentation, save_presentation
+
+SAMPLE_SLIDE = {
+    "theme": "公用車EV化導入計画",
+    "department": "総務部 財産管理課",
+    "content": [
+        {"column": "left", "label": "📉 01. 背景", "text": "・2050年カーボンニュートラルに向け、**公用車のCO2排出削減**が急務である。\n・現行の公用車120台のうちEVは5台にとどまる。", "layout_type": "text"},
+        {"column": "left", "label": "⚠️ 02. 課題", "text": "・車両価格が高く、**初期費用の確保**が課題である。\n・庁舎の充電設備が不足している。\n・職員の運用ルールが未整備である。", "layout_type": "text"},
+        {"column": "left", "label": "🎯 03. 目標", "text": "・2030年度までに公用車の50%をEV化する。\n・年間CO2排出量を120t削減する。", "layout_type": "text"},
+        {"column": "right", "label": "🚀 04. 施策", "text": "・ステップ1: 現状調査\n・ステップ2: 充電設備整備\n・ステップ3: リース導入\n・ステップ4: 効果検証", "layout_type": "flow_horizontal"},
+        {"column": "right", "label": "💴 05. 予算", "text": "・令和7年度: 充電設備 2,400万円\n・リース費用: 年額 1,800万円（国庫補助 1/2）", "layout_type": "text"},
+        {"column": "right", "label": "✅ 06. 効果", "text": "・燃料費を年間約600万円削減する。\n・災害時の非常用電源として活用できる。", "layout_type": "text"},
+    ],
+}
+
+# (表示名, 保存関数)
+MODES = [
+    ("python-pptx default", lambda prs, buf: prs.save(buf)),
+    ("store", lambda prs, buf: save_presentation(prs, buf, "store")),
+    ("deflate level 1", lambda prs, buf: save_presentation(prs, buf, "deflate", 1)),
+    ("deflate level 6", lambda prs, buf: save_presentation(prs, buf, "deflate", 6)),
+    ("deflate level 9", lambda prs, buf: save_presentation(prs, buf, "deflate", 9)),
+]
+
+
+def bench(n: int) -> None:
+    prs = build_a3_presentation(SAMPLE_SLIDE)
+
+    start = time.perf_counter()
+    for _ in range(n):
+        build_a3_presentation(SAMPLE_SLIDE)
+    render_ms = (time.perf_counter() - start) / n * 1000
+    print(f"render (build_a3_presentation): {render_ms:.2f} ms/deck\n")
+
+    print(f"{'mode':<22}{'save ms':>10}{'size KB':>10}")
+    for name, save in MODES:
+        start = time.perf_counter()
+        for _ in range(n):
+            buf = io.BytesIO()
+            save(prs, buf)
+        save_ms = (time.perf_counter() - start) / n * 1000
+        print(f"{name:<22}{save_ms:>10.2f}{len(buf.getvalue()) / 1024:>10.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="PPTX 保存方式のベンチマーク")
+    parser.add_argument("-n", type=int, default=50, help="計測回数")
+    bench(parser.parse_args().n)
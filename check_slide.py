@@ -0,0 +1,158 @@
+"""
+生成スライドの品質チェック（03_quality_assurance_workflow.md の Design QA を自動化）。
+
+generate_slide.py と同じレイアウト計算・文字計測を使い、スライドJSONを
+描画せずに検査する。大量のデッキを並列で処理し、JSON Lines でレポートを出力する。
+
+    python check_slide.py specs/ -o report.jsonl -j 8
+"""
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from generate_slide import (
+    FLOW_FONT_SIZE, FLOW_LAYOUTS, HEADING_FONT_SIZE, MARGIN_CM, MIN_FONT_SIZES,
+    SLIDE_WIDTH_CM, body_font_size, content_frame, plan_flow,
+    flow_steps, measure_body_height_cm, measure_text_height_cm, section_body_rect,
+    column_slots, text_width_cm, title_font_size,
+)
+from slide_model import SlideDoc, SlideItem
+
+SPEC_EXTENSIONS = (".json", ".jsonl")
+
+
+def analyze_slide(json_data: "dict | SlideDoc") -> list[dict]:
+    """1枚分のスライドを検査し、問題点のリストを返す（問題なしなら空）。"""
+    doc = SlideDoc.from_json(json_data)
+    issues = []
+
+    # --- Header ---
+    title = doc.theme
+    size = title_font_size(title)
+    if size < MIN_FONT_SIZES["title"]:
+        issues.append({"kind": "font_below_min", "where": "title", "role": "title",
+                       "font_pt": size, "min_pt": MIN_FONT_SIZES["title"]})
+    title_w = SLIDE_WIDTH_CM - 2*MARGIN_CM
+    if text_width_cm(title, size) > title_w:
+        issues.append({"kind": "overflow", "where": "title",
+                       "required_cm": round(text_width_cm(title, size), 2), "available_cm": round(title_w, 2)})
+
+    # --- Columns ---
+    left_x, right_x, col_width, content_top, content_height = content_frame()
+    for column, x, items in (("left", left_x, doc.left), ("right", right_x, doc.right)):
+        for index, (item, (y, h)) in enumerate(zip(items, column_slots(len(items), content_top, content_height))):
+            where = {"column": column, "index": index, "label": item.label}
+            for issue in _analyze_item(item, x, y, col_width, h):
+                issues.append({**issue, **where})
+    return issues
+
+
+def _analyze_item(item: SlideItem, x: float, y: float, w: float, h: float) -> list[dict]:
+    issues = []
+    label = item.label
+    text = item.text
+
+    # 見出しは折り返さず1行で描画される（幅を超えると枠外にはみ出す）
+    label_w = text_width_cm(label, HEADING_FONT_SIZE)
+    if label_w > w - 0.4:
+        issues.append({"kind": "overflow", "where": "label",
+                       "required_cm": round(label_w, 2), "available_cm": round(w - 0.4, 2)})
+
+    if item.layout_type in FLOW_LAYOUTS:
+        steps = flow_steps(text)
+        if not steps:
+            return issues
+        plan = plan_flow(x, y, w, h, steps, item.layout_type)
+        if plan is not None:
+            if FLOW_FONT_SIZE < MIN_FONT_SIZES["body"]:
+                issues.append({"kind": "font_below_min", "where": "flow", "role": "body",
+                               "font_pt": FLOW_FONT_SIZE, "min_pt": MIN_FONT_SIZES["body"]})
+            for step_index, (step, (_, _, box_w, box_h)) in enumerate(zip(steps, plan.boxes)):
+                need = measure_text_height_cm(step, FLOW_FONT_SIZE, box_w)
+                if need > box_h:
+                    issues.append({"kind": "overflow", "where": "flow", "step": step_index,
+                                   "arrangement": plan.arrangement,
+                                   "required_cm": round(need, 2), "available_cm": round(box_h, 2)})
+            return issues
+        # 幅が足りない場合、描画側は通常セクションにフォールバックする
+
+    size = body_font_size(text)
+    if size < MIN_FONT_SIZES["body"]:
+        issues.append({"kind": "font_below_min", "where": "body", "role": "body",
+                       "font_pt": size, "min_pt": MIN_FONT_SIZES["body"]})
+    _, _, body_w, body_h = section_body_rect(x, y, w, h)
+    need = measure_body_height_cm(text, size, body_w)
+    if need > body_h:
+        issues.append({"kind": "overflow", "where": "body",
+                       "required_cm": round(need, 2), "available_cm": round(body_h, 2)})
+    return issues
+
+
+def analyze_file(path: str) -> list[dict]:
+    """JSON（1枚）または JSONL（1行1枚）ファイルを検査し、デッキ単位のレポートを返す。
+
+    読めないファイル・不正な行はエラーとして記録し、他の入力の検査は続ける。
+    """
+    reports = []
+    try:
+        with open(path, "rb") as f:
+            if path.endswith(".jsonl"):
+                # 行単位でデコードし、1行の文字化けでファイル全体を落とさない
+                for n, line in enumerate(f, 1):
+                    if line.strip():
+                        reports.append(_analyze_source(f"{path}:{n}", line))
+            else:
+                reports.append(_analyze_source(path, f.read()))
+    except OSError as e:
+        reports.append({"source": path, "ok": False, "error": f"{type(e).__name__}: {e}", "issues": []})
+    return reports
+
+
+def _analyze_source(source: str, raw: bytes) -> dict:
+    try:
+        doc = SlideDoc.from_json(json.loads(raw.decode("utf-8")))
+        issues = analyze_slide(doc)
+    except (ValueError, AttributeError, TypeError) as e:
+        # UnicodeDecodeError / JSONDecodeError は ValueError のサブクラス
+        return {"source": source, "ok": False, "error": f"{type(e).__name__}: {e}", "issues": []}
+    return {"source": source, "theme": doc.theme, "ok": not issues, "issues": issues}
+
+
+def _iter_spec_files(paths: list[str]):
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                for name in sorted(files):
+                    if name.endswith(SPEC_EXTENSIONS):
+                        yield os.path.join(root, name)
+        else:
+            yield path
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="スライドJSONのはみ出し・フォントサイズ検査")
+    parser.add_argument("paths", nargs="+", help="スライドJSON (.json / .jsonl) またはディレクトリ")
+    parser.add_argument("-o", "--output", help="レポート出力先 (JSON Lines)。省略時は標準出力")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="並列プロセス数")
+    args = parser.parse_args(argv)
+
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    decks = failed = 0
+    try:
+        with ProcessPoolExecutor(max_workers=args.jobs) as pool:
+            for reports in pool.map(analyze_file, _iter_spec_files(args.paths), chunksize=16):
+                for report in reports:
+                    decks += 1
+                    failed += not report["ok"]
+                    out.write(json.dumps(report, ensure_ascii=False) + "\n")
+    finally:
+        if out is not sys.stdout: out.close()
+
+    print(f"Checked: {decks} decks, {failed} with issues", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
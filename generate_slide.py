@@ -1,11 +1,18 @@
 import json
+import math
+from dataclasses import dataclass
 import re
+import unicodedata
+import zipfile
 from pptx import Presentation
+from pptx.opc.serialized import PackageWriter
 from pptx.util import Cm, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from pptx.dml.color import RGBColor
 from pptx.enum.shapes import MSO_SHAPE
 
+from slide_model import SlideDoc
+
 # --- Configuration (A3 Size) ---
 SLIDE_WIDTH_CM = 42.0
 SLIDE_HEIGHT_CM = 29.7
@@ -27,7 +34,72 @@ COLOR_BORDER = RGBColor(220, 220, 220) # Light Gray
 FONT_NAME_BODY = "Meiryo UI"
 FONT_NAME_BOLD = "Meiryo UI" 
 
-def create_a3_slide(json_data, output_filename="output_slide.pptx"):
+# Font Sizes (pt)
+TITLE_FONT_SIZES = ((40, 20), (30, 24), (20, 28))  # (文字数の閾値, サイズ) 長い順
+TITLE_FONT_DEFAULT = 32
+HEADING_FONT_SIZE = 20
+BODY_FONT_SIZE = 14
+BODY_FONT_SIZE_LONG = 12
+BODY_LONG_CHARS = 250
+FLOW_FONT_SIZE = 10
+
+# 01_slide_design_guidelines.md の最小フォントサイズ（役割別）
+MIN_FONT_SIZES = {"title": 24, "heading": 16, "body": 10.5}
+
+# Section / Flow Geometry
+SECTION_HEADER_CM = 1.0
+FLOW_MAX_STEPS = 4          # 1行に並べる最大ステップ数（超えると折り返す）
+FLOW_ARROW_CM = 0.8
+FLOW_ROW_GAP_CM = 0.6       # 折り返し・縦フローの行間（下向き矢印）
+# 横: flow_horizontal / 折り返し: flow_wrapped / 縦: flow_vertical / 自動選択: flow
+FLOW_LAYOUTS = ("flow", "flow_horizontal", "flow_wrapped", "flow_vertical")
+
+# --- Text Measurement ---
+# python-pptx のテキストボックス既定の内部余白 (0.1in / 0.05in)
+PT_PER_CM = 72 / 2.54
+TEXT_INSET_X_CM = 0.254
+TEXT_INSET_Y_CM = 0.127
+LINE_HEIGHT_FACTOR = 1.2    # フォントサイズに対する1行の高さ
+BODY_LINE_SPACING = 1.2
+BODY_SPACE_AFTER_PT = 6
+DEFAULT_PARAGRAPH_PT = 18   # text_frame 先頭の空段落（PowerPoint既定サイズ）
+HALF_WIDTH_EM = 0.55        # 半角文字の幅（全角=1.0em）
+
+# --- Output Packaging ---
+# store: 無圧縮（中間生成物向け・最速） / deflate: 通常の PPTX（compresslevel 0〜9）
+COMPRESSION_MODES = {"store": zipfile.ZIP_STORED, "deflate": zipfile.ZIP_DEFLATED}
+
+def create_a3_slide(json_data, output_filename="output_slide.pptx", compression="deflate", compresslevel=None):
+    prs = build_a3_presentation(json_data)
+    save_presentation(prs, output_filename, compression, compresslevel)
+    print(f"Generated: {output_filename}")
+
+
+def check_compression(compression, compresslevel=None):
+    """圧縮方式とレベルを検証する。不正なら ValueError（save_presentation・API の入力検証で共用）。"""
+    if compression not in COMPRESSION_MODES:
+        raise ValueError(f"Unknown compression: {compression} (choose from {', '.join(COMPRESSION_MODES)})")
+    if compresslevel is not None and (type(compresslevel) is not int or not 0 <= compresslevel <= 9):
+        raise ValueError(f"Invalid compresslevel: {compresslevel!r} (choose from 0-9)")
+
+
+def save_presentation(prs, pkg_file, compression="deflate", compresslevel=None):
+    """圧縮方式を指定して PPTX を保存する（prs.save は常に既定の deflate）。
+
+    pkg_file はパスまたはファイルライクオブジェクト。compresslevel=None は zlib の既定値。
+    不正な指定は書き出しを始める前に ValueError にする（途中まで書いたファイルを残さない）。
+    """
+    check_compression(compression, compresslevel)
+    package = prs.part.package
+    _TunedPackageWriter(pkg_file, package._rels, tuple(package.iter_parts()),
+                        COMPRESSION_MODES[compression], compresslevel)._write()
+
+
+def build_a3_presentation(json_data):
+    """スライドを描画した Presentation を返す（保存はしない）。"""
+    # dict（リスト形式・旧 box1〜box8 形式）は一度だけ正規化する
+    doc = SlideDoc.from_json(json_data)
+
     prs = Presentation()
     prs.slide_width = Cm(SLIDE_WIDTH_CM)
     prs.slide_height = Cm(SLIDE_HEIGHT_CM)
@@ -39,9 +111,20 @@ def create_a3_slide(json_data, output_filename="output_slide.pptx"):
     slide.background.fill.fore_color.rgb = COLOR_WHITE
 
     # --- Header ---
-    _draw_header(slide, json_data)
+    _draw_header(slide, doc)
 
     # --- Layout Calculations ---
+    left_x, right_x, col_width, content_top, content_height = content_frame()
+
+    # --- Draw Columns ---
+    _draw_dynamic_column(slide, doc.left, left_x, content_top, col_width, content_height)
+    _draw_dynamic_column(slide, doc.right, right_x, content_top, col_width, content_height)
+
+    return prs
+
+
+def content_frame() -> tuple[float, float, float, float, float]:
+    """本文領域の (左カラムx, 右カラムx, カラム幅, 上端y, 高さ) を返す。"""
     # Adjust top margin
     content_top = MARGIN_CM + HEADER_HEIGHT_CM + 0.5
     content_height = SLIDE_HEIGHT_CM - content_top - MARGIN_CM
@@ -51,53 +134,157 @@ def create_a3_slide(json_data, output_filename="output_slide.pptx"):
     
     left_x = MARGIN_CM
     right_x = MARGIN_CM + col_width + COL_GAP_CM
+    return left_x, right_x, col_width, content_top, content_height
 
-    # --- Content Processing ---
-    content = json_data.get("content", [])
-    
-    left_items = []
-    right_items = []
-
-    if isinstance(content, dict):
-        mapping = {
-            "box1": "left", "box2": "left", "box3": "left", "box4": "left",
-            "box5": "right", "box6": "right", "box7": "right", "box8": "right"
-        }
-        for k, v in content.items():
-            side = "left"
-            if "box5" in k or "box6" in k or "box7" in k or "box8" in k: side = "right"
-            label = "Section"
-            if "background" in k: label = "背景"
-            elif "necessity" in k: label = "課題"
-            elif "plan" in k: label = "施策"
-            
-            item = {"label": label, "text": v}
-            if side == "left": left_items.append(item)
-            else: right_items.append(item)
+
+def column_slots(count: int, y: float, total_h: float) -> list[tuple[float, float]]:
+    """カラム内に縦積みするボックスの (y, 高さ) を返す（空白を作らず等分）。"""
+    if count == 0: return []
+    item_h = (total_h - (count - 1) * BOX_GAP_CM) / count
+    return [(y + i * (item_h + BOX_GAP_CM), item_h) for i in range(count)]
+
+
+def title_font_size(title_text: str) -> int:
+    """タイトル文字数に応じたフォントサイズ。"""
+    for limit, size in TITLE_FONT_SIZES:
+        if len(title_text) > limit: return size
+    return TITLE_FONT_DEFAULT
+
+
+def body_font_size(text: str) -> float:
+    """本文の文字数に応じたフォントサイズ（14pt、長文は12pt）。"""
+    return BODY_FONT_SIZE_LONG if len(text) > BODY_LONG_CHARS else BODY_FONT_SIZE
+
+
+def body_lines(raw_text: str) -> list[str]:
+    """本文を段落単位に分割し、箇条書き記号を「・」に統一する。"""
+    lines = []
+    for line in raw_text.split('\n'):
+        line = line.strip()
+        if not line: continue
+        # Use full-width bullet for aesthetics if desired, but sticking to text consistency
+        if line.startswith("・") or line.startswith("-") or line.startswith("●"):
+            line = "・" + line[1:].strip() # Enforce Japanese bullet
+        lines.append(line)
+    return lines
+
+
+def flow_steps(text: str) -> list[str]:
+    """フロー図のステップ（1行1ステップ、行頭の箇条書き記号は除去）。"""
+    return [line.strip().lstrip('・-●').strip() for line in text.split('\n') if line.strip()]
+
+
+def _text_width_pt(text: str, font_size_pt: float) -> float:
+    # 全角（East Asian Wide/Fullwidth/Ambiguous）は1em、それ以外は半角幅で概算
+    width = 0.0
+    for ch in text:
+        width += font_size_pt if unicodedata.east_asian_width(ch) in "FWA" else font_size_pt * HALF_WIDTH_EM
+    return width
+
+
+def text_width_cm(text: str, font_size_pt: float) -> float:
+    """折り返しなしで1行に並べた場合のテキスト幅(cm)。"""
+    return _text_width_pt(text, font_size_pt) / PT_PER_CM + 2 * TEXT_INSET_X_CM
+
+
+def _line_count(text: str, font_size_pt: float, box_w_cm: float) -> int:
+    avail_pt = max(box_w_cm - 2 * TEXT_INSET_X_CM, 0.01) * PT_PER_CM
+    return max(1, math.ceil(_text_width_pt(text.replace("**", ""), font_size_pt) / avail_pt))
+
+
+def measure_body_height_cm(text: str, font_size_pt: float, box_w_cm: float) -> float:
+    """_draw_section の本文テキストボックスに必要な高さ(cm)を見積もる。"""
+    line_pt = font_size_pt * LINE_HEIGHT_FACTOR * BODY_LINE_SPACING
+    height_pt = DEFAULT_PARAGRAPH_PT * LINE_HEIGHT_FACTOR
+    for line in body_lines(text):
+        height_pt += _line_count(line, font_size_pt, box_w_cm) * line_pt + BODY_SPACE_AFTER_PT
+    return height_pt / PT_PER_CM + 2 * TEXT_INSET_Y_CM
+
+
+def measure_text_height_cm(text: str, font_size_pt: float, box_w_cm: float) -> float:
+    """1段落のテキスト（フロー図のステップ等）に必要な高さ(cm)を見積もる。"""
+    lines = _line_count(text, font_size_pt, box_w_cm)
+    return lines * font_size_pt * LINE_HEIGHT_FACTOR / PT_PER_CM + 2 * TEXT_INSET_Y_CM
+
+
+def section_body_rect(x: float, y: float, w: float, h: float) -> tuple[float, float, float, float]:
+    """_draw_section の本文テキストボックスの (x, y, 幅, 高さ)。"""
+    return x + 0.4, y + SECTION_HEADER_CM, w - 0.6, h - SECTION_HEADER_CM - 0.2
+
+
+@dataclass(frozen=True, slots=True)
+class FlowPlan:
+    """フロー図の配置（ステップ枠と矢印の座標をまとめて計算したもの）。"""
+    arrangement: str                                    # "horizontal" / "wrapped" / "vertical"
+    rows: int
+    cols: int
+    boxes: tuple[tuple[float, float, float, float], ...]  # ステップ順の (x, y, 幅, 高さ)
+    arrows: tuple[tuple[int, float, float, float, float], ...]  # (MSO_SHAPE, x, y, 幅, 高さ)
+    overflow_cm: float                                  # 最も溢れるステップの不足高さ（0 = 全て収まる）
+
+
+def plan_flow(x: float, y: float, w: float, h: float, steps: list[str], layout_type: str = "flow") -> FlowPlan | None:
+    """ステップ数と文字量からフロー図の配置を決める。配置できない場合は None。
+
+    列数の候補（多い順）ごとに枠の大きさと文字の収まりを計算し、全ステップが収まる
+    最初の候補を採用する（収まる候補がなければ不足が最小のもの）。
+    行は蛇行順（偶数行は左→右、奇数行は右→左）に並べ、行の変わり目は下向き矢印で繋ぐ。
+    """
+    n = len(steps)
+    if n == 0: return None
+    max_cols = min(n, FLOW_MAX_STEPS)
+    if layout_type == "flow_horizontal":
+        candidates = [max_cols]
+    elif layout_type == "flow_wrapped":
+        candidates = [c for c in range(max_cols, 1, -1) if math.ceil(n / c) > 1] or [max_cols]
+    elif layout_type == "flow_vertical":
+        candidates = [1]
     else:
-        for item in content:
-            if item.get("column") == "left":
-                left_items.append(item)
-            elif item.get("column") == "right":
-                right_items.append(item)
+        candidates = range(max_cols, 0, -1)
 
-    # --- Draw Columns ---
-    _draw_dynamic_column(slide, left_items, left_x, content_top, col_width, content_height)
-    _draw_dynamic_column(slide, right_items, right_x, content_top, col_width, content_height)
+    content_x = x + 0.4
+    content_y = y + SECTION_HEADER_CM + 0.2
+    content_w = w - 0.8 # Padding
+    content_h = h - SECTION_HEADER_CM - 0.4
 
-    prs.save(output_filename)
-    print(f"Generated: {output_filename}")
+    best = None
+    for cols in candidates:
+        rows = math.ceil(n / cols)
+        box_w = (content_w - FLOW_ARROW_CM * (cols - 1)) / cols
+        box_h = (content_h - FLOW_ROW_GAP_CM * (rows - 1)) / rows
+        if box_w <= 0 or box_h <= 0: continue
+        overflow = max(0.0, max(measure_text_height_cm(step, FLOW_FONT_SIZE, box_w) for step in steps) - box_h)
+        if best is None or overflow < best[0]:
+            best = (overflow, cols, rows, box_w, box_h)
+        if overflow == 0: break
+    if best is None: return None
+
+    overflow, cols, rows, box_w, box_h = best
+    boxes = []
+    for i in range(n):
+        row, col = divmod(i, cols)
+        if row % 2: col = cols - 1 - col
+        boxes.append((content_x + col * (box_w + FLOW_ARROW_CM), content_y + row * (box_h + FLOW_ROW_GAP_CM), box_w, box_h))
+
+    arrows = []
+    for (ax, ay, _, _), (bx, by, _, _) in zip(boxes, boxes[1:]):
+        if by > ay:
+            arrows.append((MSO_SHAPE.DOWN_ARROW, ax + box_w/2 - 0.2, ay + box_h + 0.1, 0.4, FLOW_ROW_GAP_CM - 0.2))
+        elif bx > ax:
+            arrows.append((MSO_SHAPE.RIGHT_ARROW, ax + box_w + 0.1, ay + box_h/2 - 0.2, FLOW_ARROW_CM - 0.2, 0.4))
+        else:
+            arrows.append((MSO_SHAPE.LEFT_ARROW, bx + box_w + 0.1, ay + box_h/2 - 0.2, FLOW_ARROW_CM - 0.2, 0.4))
+
+    arrangement = "horizontal" if rows == 1 else "vertical" if cols == 1 else "wrapped"
+    return FlowPlan(arrangement, rows, cols, tuple(boxes), tuple(arrows), overflow)
 
 
-def _draw_header(slide, data):
+def _draw_header(slide, doc):
     # Title Fitting Logic
-    title_text = data.get('theme', 'Untitled')
+    title_text = doc.theme
     
     # Estimate size: if long, reduce font
-    font_size = 32
-    if len(title_text) > 20: font_size = 28
-    if len(title_text) > 30: font_size = 24
-    if len(title_text) > 40: font_size = 20
+    font_size = title_font_size(title_text)
     
     title_box = slide.shapes.add_textbox(
         Cm(MARGIN_CM), Cm(MARGIN_CM), 
@@ -118,7 +305,7 @@ def _draw_header(slide, data):
     )
     tf_sub = sub_box.text_frame
     p_sub = tf_sub.paragraphs[0]
-    p_sub.text = data.get('department', '')
+    p_sub.text = doc.department
     p_sub.font.size = Pt(14)
     p_sub.font.color.rgb = COLOR_TEXT_MUTED
     p_sub.font.name = FONT_NAME_BODY
@@ -135,22 +322,11 @@ def _draw_header(slide, data):
 
 
 def _draw_dynamic_column(slide, items, x, y, w, total_h):
-    count = len(items)
-    if count == 0: return
-
-    total_gap = (count - 1) * BOX_GAP_CM
-    avail_h = total_h - total_gap
-    item_h = avail_h / count
-    
-    current_y = y
-    
-    for item in items:
-        layout = item.get("layout_type", "text")
-        if layout == "flow_horizontal":
-            _draw_flow_horizontal(slide, x, current_y, w, item_h, item.get("label", ""), item.get("text", ""))
+    for item, (item_y, item_h) in zip(items, column_slots(len(items), y, total_h)):
+        if item.layout_type in FLOW_LAYOUTS:
+            _draw_flow(slide, x, item_y, w, item_h, item.label, item.text, item.layout_type)
         else:
-            _draw_section(slide, x, current_y, w, item_h, item.get("label", ""), item.get("text", ""))
-        current_y += item_h + BOX_GAP_CM
+            _draw_section(slide, x, item_y, w, item_h, item.label, item.text)
 
 
 def _draw_section(slide, x, y, w, h, label, text):
@@ -165,7 +341,7 @@ def _draw_section(slide, x, y, w, h, label, text):
     box.line.color.rgb = COLOR_BORDER
     box.line.width = Pt(1.0) # Thin border
 
-    header_h = 1.0
+    header_h = SECTION_HEADER_CM
     
     # Accent Bar (Inside box)
     bar = slide.shapes.add_shape(
@@ -184,7 +360,7 @@ def _draw_section(slide, x, y, w, h, label, text):
     )
     p = label_box.text_frame.paragraphs[0]
     p.text = label
-    p.font.size = Pt(20) # Requested 20pt
+    p.font.size = Pt(HEADING_FONT_SIZE) # Requested 20pt
     p.font.bold = True
     p.font.name = FONT_NAME_BOLD
     p.font.color.rgb = COLOR_MAIN
@@ -192,18 +368,15 @@ def _draw_section(slide, x, y, w, h, label, text):
     label_box.text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     
     # 2. Content Body
-    content_y = y + header_h
-    content_h = h - header_h - 0.2
+    body_x, body_y, body_w, body_h = section_body_rect(x, y, w, h)
     
     # Auto-scaling font logic
     # Base 14pt, Scale to 12pt if needed
-    char_count = len(text)
-    font_size = 14
-    if char_count > 250: font_size = 12
+    font_size = body_font_size(text)
     
     text_box = slide.shapes.add_textbox(
-        Cm(x + 0.4), Cm(content_y),
-        Cm(w - 0.6), Cm(content_h)
+        Cm(body_x), Cm(body_y),
+        Cm(body_w), Cm(body_h)
     )
     tf = text_box.text_frame
     tf.word_wrap = True
@@ -213,22 +386,12 @@ def _draw_section(slide, x, y, w, h, label, text):
 
 
 def _add_formatted_text(text_frame, raw_text, font_size_pt):
-    lines = raw_text.split('\n')
-    for line in lines:
-        line = line.strip()
-        if not line: continue
-        
+    for clean_text in body_lines(raw_text):
         p = text_frame.add_paragraph()
-        p.space_after = Pt(6)
+        p.space_after = Pt(BODY_SPACE_AFTER_PT)
         p.level = 0
-        p.line_spacing = 1.2 # Requested 1.2
+        p.line_spacing = BODY_LINE_SPACING # Requested 1.2
         
-        clean_text = line
-        # Use full-width bullet for aesthetics if desired, but sticking to text consistency
-        if line.startswith("・") or line.startswith("-") or line.startswith("●"):
-            clean_text = line[1:].strip()
-            clean_text = "・" + clean_text # Enforce Japanese bullet
-            
         parts = re.split(r'(\*\*.*?\*\*)', clean_text)
         
         for part in parts:
@@ -252,7 +415,7 @@ def _add_formatted_text(text_frame, raw_text, font_size_pt):
                 run.font.color.rgb = COLOR_MAIN
 
 
-def _draw_flow_horizontal(slide, x, y, w, h, label, text):
+def _draw_flow(slide, x, y, w, h, label, text, layout_type="flow_horizontal"):
     # 1. Outer Container (Same style as normal section)
     # Border Box (Light Gray)
     box = slide.shapes.add_shape(
@@ -265,7 +428,7 @@ def _draw_flow_horizontal(slide, x, y, w, h, label, text):
     box.line.color.rgb = COLOR_BORDER
     box.line.width = Pt(1.0)
 
-    header_h = 1.0
+    header_h = SECTION_HEADER_CM
     
     # Accent Bar
     bar = slide.shapes.add_shape(
@@ -284,50 +447,34 @@ def _draw_flow_horizontal(slide, x, y, w, h, label, text):
     )
     p = label_box.text_frame.paragraphs[0]
     p.text = label
-    p.font.size = Pt(20)
+    p.font.size = Pt(HEADING_FONT_SIZE)
     p.font.bold = True
     p.font.name = FONT_NAME_BOLD
     p.font.color.rgb = COLOR_MAIN
     label_box.text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
     
     # 2. Flow Content
-    content_y = y + header_h + 0.2
-    content_h = h - header_h - 0.4
-    content_w = w - 0.8 # Padding
-    start_x = x + 0.4
-    
     # Extract steps from text (bullet points)
     # Assume lines starting with bullets are steps
-    raw_lines = text.split('\n')
-    steps = [line.strip().lstrip('・-●').strip() for line in raw_lines if line.strip()]
+    steps = flow_steps(text)
     
     if not steps: return
 
-    # Calculate dimensions
-    step_count = len(steps)
-    # Max steps to display horizontally to avoid crowding: 4
-    if step_count > 4: step_count = 4 
-    display_steps = steps[:step_count]
-    
-    # Widths: [Box] [Arrow] [Box] ...
-    # Arrow assume 0.8cm
-    arrow_w = 0.8
-    total_arrow_w = arrow_w * (step_count - 1)
+    # 配置（横一列・折り返し・縦）を一度に計算してから図形を追加する
+    plan = plan_flow(x, y, w, h, steps, layout_type)
     
-    if total_arrow_w >= content_w:
+    if plan is None:
         # Fallback to simple text if not enough space
         _draw_section(slide, x, y, w, h, label, text)
         return
 
-    box_w = (content_w - total_arrow_w) / step_count
-    
-    curr_x = start_x
-    for i, step_text in enumerate(display_steps):
+    shapes = slide.shapes
+    for step_text, (box_x, box_y, box_w, box_h) in zip(steps, plan.boxes):
         # Draw Box
-        step_box = slide.shapes.add_shape(
+        step_box = shapes.add_shape(
             MSO_SHAPE.ROUNDED_RECTANGLE,
-            Cm(curr_x), Cm(content_y),
-            Cm(box_w), Cm(content_h)
+            Cm(box_x), Cm(box_y),
+            Cm(box_w), Cm(box_h)
         )
         step_box.fill.solid()
         step_box.fill.fore_color.rgb = RGBColor(240, 248, 255) # Light AliceBlue
@@ -339,22 +486,42 @@ def _draw_flow_horizontal(slide, x, y, w, h, label, text):
         tf.word_wrap = True
         p = tf.paragraphs[0]
         p.text = step_text
-        p.font.size = Pt(10) # Smaller font for flow boxes
+        p.font.size = Pt(FLOW_FONT_SIZE) # Smaller font for flow boxes
         p.font.name = FONT_NAME_BODY
         p.font.color.rgb = COLOR_TEXT_MAIN
         p.alignment = PP_ALIGN.CENTER
         
-        curr_x += box_w
-        
-        # Draw Arrow (if not last)
-        if i < step_count - 1:
-            arrow = slide.shapes.add_shape(
-                MSO_SHAPE.RIGHT_ARROW,
-                Cm(curr_x + 0.1), Cm(content_y + content_h/2 - 0.2), # Center vertically
-                Cm(arrow_w - 0.2), Cm(0.4)
-            )
-            arrow.fill.solid()
-            arrow.fill.fore_color.rgb = COLOR_ACCENT
-            arrow.line.fill.background()
-            
-            curr_x += arrow_w
+    # Draw Arrows (between steps)
+    for shape_type, arrow_x, arrow_y, arrow_w, arrow_h in plan.arrows:
+        arrow = shapes.add_shape(
+            shape_type,
+            Cm(arrow_x), Cm(arrow_y),
+            Cm(arrow_w), Cm(arrow_h)
+        )
+        arrow.fill.solid()
+        arrow.fill.fore_color.rgb = COLOR_ACCENT
+        arrow.line.fill.background()
+
+
+class _TunedPackageWriter(PackageWriter):
+    # python-pptx の PackageWriter を、zip の圧縮方式・レベルを指定できるようにしたもの
+    def __init__(self, pkg_file, pkg_rels, parts, compress_type, compresslevel):
+        super().__init__(pkg_file, pkg_rels, parts)
+        self._compress_type = compress_type
+        self._compresslevel = compresslevel
+
+    def _write(self):
+        with zipfile.ZipFile(self._pkg_file, "w", compression=self._compress_type,
+                             compresslevel=self._compresslevel, strict_timestamps=False) as zipf:
+            phys_writer = _ZipPartWriter(zipf)
+            self._write_content_types_stream(phys_writer)
+            self._write_pkg_rels(phys_writer)
+            self._write_parts(phys_writer)
+
+
+class _ZipPartWriter:
+    def __init__(self, zipf):
+        self._zipf = zipf
+
+    def write(self, pack_uri, blob):
+        self._zipf.writestr(pack_uri.membername, blob)
@@ -0,0 +1,225 @@
+"""
+スライド構成案（SlideDoc）のローカル保存（SQLite）。
+
+AI の分析結果と STEP 2 での編集をページ再読み込みやサーバー再起動で失わないよう、
+プロジェクトID単位で保存・復元する。編集は変更のあったボックスだけを追記 (append-only) し、
+古い履歴はバックグラウンドでスナップショットに畳み込み（コンパクション）、
+長期間更新のない下書きは削除する（SLIDE_DRAFT_RETENTION_DAYS、既定30日）。
+
+    store = ProjectStore("projects.db")
+    project_id = store.create(doc)
+    store.save(project_id, edited_doc)   # 差分だけ追記
+    doc = store.load(project_id)
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import replace
+
+from slide_model import SlideDoc
+
+DEFAULT_DB_PATH = os.environ.get("SLIDE_PROJECT_DB", "projects.db")
+COMPACT_INTERVAL_SEC = 60
+COMPACT_MIN_EVENTS = 20     # 追記がこの件数以上たまったプロジェクトを畳み込む
+DRAFT_RETENTION_DAYS = float(os.environ.get("SLIDE_DRAFT_RETENTION_DAYS", 30))  # 更新がこの日数ないものは削除
+LAST_SAVED_CACHE_SIZE = 128  # 差分計算用に保持する SlideDoc の件数（超えたら古いものから捨てる）
+
+# イベントのキー: "doc"（全体の置き換え）/ "meta"（タイトル等）/ "left:0" などのボックス
+_META_FIELDS = ("theme", "department", "analysis")
+_ITEM_FIELDS = ("label", "text", "layout_type")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    theme TEXT NOT NULL DEFAULT ''
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    project_id TEXT PRIMARY KEY REFERENCES projects(id),
+    upto_seq INTEGER NOT NULL,
+    doc TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS events (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL REFERENCES projects(id),
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_project_seq ON events(project_id, seq);
+"""
+
+
+class ProjectStore:
+    """SlideDoc をプロジェクトID単位で保存する。複数スレッドから利用できる。"""
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = self._connect()
+        self._conn.executescript(_SCHEMA)
+        self._last_saved = OrderedDict()  # project_id -> 最後に保存した SlideDoc（差分計算用、LRU）
+        self._compactor = None
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    # --- 保存 ---
+    def create(self, doc: SlideDoc) -> str:
+        """新しいプロジェクトを作成し、IDを返す。"""
+        project_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.execute("INSERT INTO projects (id, created_at, updated_at, theme) VALUES (?, ?, ?, ?)",
+                               (project_id, now, now, doc.theme))
+            self._conn.execute("INSERT INTO events (project_id, key, value, created_at) VALUES (?, 'doc', ?, ?)",
+                               (project_id, _dumps(doc.to_dict()), now))
+            self._remember(project_id, doc)
+        return project_id
+
+    def save(self, project_id: str, doc: SlideDoc) -> int:
+        """前回保存時から変更のあった部分だけを追記する。戻り値は追記した件数。"""
+        with self._lock:
+            previous = self._last_saved.get(project_id)
+        previous = previous or self.load(project_id)
+        if previous is None:
+            raise KeyError(f"Unknown project: {project_id}")
+        if previous.digest == doc.digest:
+            return 0
+
+        events = _diff(previous, doc)
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("BEGIN")
+            self._conn.executemany("INSERT INTO events (project_id, key, value, created_at) VALUES (?, ?, ?, ?)",
+                                   [(project_id, key, _dumps(value), now) for key, value in events])
+            self._conn.execute("UPDATE projects SET updated_at = ?, theme = ? WHERE id = ?", (now, doc.theme, project_id))
+            self._remember(project_id, doc)
+        return len(events)
+
+    # --- 復元 ---
+    def load(self, project_id: str) -> SlideDoc | None:
+        """スナップショットと以降の追記を適用して SlideDoc を復元する。存在しなければ None。"""
+        with self._lock:
+            doc, _ = self._replay(self._conn, project_id)
+            if doc is not None:
+                self._remember(project_id, doc)
+        return doc
+
+    def _remember(self, project_id: str, doc: SlideDoc) -> None:
+        # self._lock を取得した状態で呼ぶ。捨てたプロジェクトは次の save で DB から復元する
+        self._last_saved[project_id] = doc
+        self._last_saved.move_to_end(project_id)
+        while len(self._last_saved) > LAST_SAVED_CACHE_SIZE:
+            self._last_saved.popitem(last=False)
+
+    def recent(self, project_ids: list[str], limit: int = 10) -> list[tuple[str, str, float]]:
+        """project_ids のうち最近更新したものの (ID, タイトル, 更新時刻) を新しい順に返す。
+
+        DB は全利用者で共有するため、一覧は呼び出し側が作成・オープンしたIDに限定する。
+        """
+        if not project_ids:
+            return []
+        placeholders = ",".join("?" * len(project_ids))
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT id, theme, updated_at FROM projects WHERE id IN ({placeholders}) "
+                "ORDER BY updated_at DESC LIMIT ?", (*project_ids, limit)
+            ).fetchall()
+
+    @staticmethod
+    def _replay(conn: sqlite3.Connection, project_id: str) -> tuple[SlideDoc | None, int]:
+        row = conn.execute("SELECT upto_seq, doc FROM snapshots WHERE project_id = ?", (project_id,)).fetchone()
+        upto_seq, doc = (row[0], SlideDoc.from_json(json.loads(row[1]))) if row else (0, None)
+        for seq, key, value in conn.execute(
+                "SELECT seq, key, value FROM events WHERE project_id = ? AND seq > ? ORDER BY seq",
+                (project_id, upto_seq)):
+            doc = _apply(doc, key, json.loads(value))
+            upto_seq = seq
+        return doc, upto_seq
+
+    # --- コンパクション ---
+    def compact(self, min_events: int = COMPACT_MIN_EVENTS, retention_days: float | None = DRAFT_RETENTION_DAYS) -> int:
+        """追記が min_events 件以上のプロジェクトをスナップショットに畳み込む。戻り値は対象件数。
+
+        retention_days 日以上更新のないプロジェクトは先に削除する（None なら削除しない）。
+        """
+        conn = self._connect()  # バックグラウンドスレッドからも呼ぶため専用の接続を使う
+        try:
+            if retention_days is not None:
+                self._expire(conn, time.time() - retention_days * 86400)
+            targets = [row[0] for row in conn.execute(
+                "SELECT project_id FROM events GROUP BY project_id HAVING COUNT(*) >= ?", (min_events,))]
+            for project_id in targets:
+                with conn:
+                    conn.execute("BEGIN IMMEDIATE")
+                    doc, upto_seq = self._replay(conn, project_id)
+                    conn.execute("INSERT OR REPLACE INTO snapshots (project_id, upto_seq, doc) VALUES (?, ?, ?)",
+                                 (project_id, upto_seq, _dumps(doc.to_dict())))
+                    conn.execute("DELETE FROM events WHERE project_id = ? AND seq <= ?", (project_id, upto_seq))
+            return len(targets)
+        finally:
+            conn.close()
+
+    def _expire(self, conn: sqlite3.Connection, cutoff: float) -> None:
+        with conn:
+            conn.execute("BEGIN IMMEDIATE")
+            expired = [row[0] for row in conn.execute("SELECT id FROM projects WHERE updated_at < ?", (cutoff,))]
+            for table, column in (("events", "project_id"), ("snapshots", "project_id"), ("projects", "id")):
+                conn.executemany(f"DELETE FROM {table} WHERE {column} = ?", [(i,) for i in expired])
+        with self._lock:
+            for project_id in expired:
+                self._last_saved.pop(project_id, None)
+
+    def start_compactor(self, interval: float = COMPACT_INTERVAL_SEC) -> None:
+        """一定間隔で compact を実行するデーモンスレッドを起動する（起動済みなら何もしない）。"""
+        if self._compactor is not None: return
+
+        def loop():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.compact()
+                except sqlite3.Error:
+                    pass  # 次の周期で再試行する
+
+        self._compactor = threading.Thread(target=loop, name="project-compactor", daemon=True)
+        self._compactor.start()
+
+
+def _diff(previous: SlideDoc, doc: SlideDoc) -> list[tuple[str, object]]:
+    # ボックスの数が変わった場合は全体を置き換える
+    if len(previous.left) != len(doc.left) or len(previous.right) != len(doc.right):
+        return [("doc", doc.to_dict())]
+
+    events = []
+    meta = {f: getattr(doc, f) for f in _META_FIELDS}
+    if any(getattr(previous, f) != v for f, v in meta.items()):
+        events.append(("meta", meta))
+    for column in ("left", "right"):
+        for i, (old, new) in enumerate(zip(previous.column(column), doc.column(column))):
+            if old != new:
+                events.append((f"{column}:{i}", {f: getattr(new, f) for f in _ITEM_FIELDS}))
+    return events
+
+
+def _apply(doc: SlideDoc | None, key: str, value) -> SlideDoc:
+    if key == "doc":
+        return SlideDoc.from_json(value)
+    if key == "meta":
+        return replace(doc, **value)
+    column, index = key.split(":")
+    return doc.update_item(column, int(index), **value)
+
+
+def _dumps(value) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
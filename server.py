@@ -0,0 +1,288 @@
+"""
+スライド生成の HTTP サービス（ASGI）。Streamlit UI を介さずに他システムから利用する。
+
+    POST /render    スライドJSON → PPTX（?compression=store|deflate&level=0-9）
+    POST /analyze   {"topic", "overview", "box_count", "model"} → 構成案JSON
+    GET  /metrics   Prometheus 形式のメトリクス
+    GET  /healthz   死活監視
+
+起動例（オフライン・スタブモデル）:
+    SLIDE_MODEL_BACKEND=stub uvicorn server:app --workers 1
+
+環境変数:
+    GEMINI_API_KEY          Gemini API キー（stub の場合は不要）
+    RENDER_WORKERS          描画プロセス数（既定: CPU数）
+    RENDER_TIMEOUT_SEC      /render のタイムアウト秒（既定: 30）
+    ANALYZE_TIMEOUT_SEC     /analyze のタイムアウト秒（既定: 120）
+    RENDER_MAX_PENDING      描画の受付上限（実行中＋待ち。既定: 描画プロセス数×4）。超えると 503
+    ANALYZE_MAX_PENDING     AI 呼び出しの受付上限（既定: 32）。超えると 503
+    ALLOWED_MODELS          /analyze で指定できるモデル名（カンマ区切り）
+"""
+import asyncio
+import io
+import json
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import parse_qs
+
+import ai_structure
+from generate_slide import build_a3_presentation, check_compression, save_presentation
+from slide_model import SlideDoc
+
+RENDER_WORKERS = int(os.environ.get("RENDER_WORKERS", os.cpu_count() or 1))
+RENDER_TIMEOUT_SEC = float(os.environ.get("RENDER_TIMEOUT_SEC", 30))
+ANALYZE_TIMEOUT_SEC = float(os.environ.get("ANALYZE_TIMEOUT_SEC", 120))
+RENDER_MAX_PENDING = int(os.environ.get("RENDER_MAX_PENDING", RENDER_WORKERS * 4))
+ANALYZE_WORKERS = 8
+ANALYZE_MAX_PENDING = int(os.environ.get("ANALYZE_MAX_PENDING", 32))
+MAX_BODY_BYTES = 1024 * 1024
+DEFAULT_MODEL = "gemini-1.5-flash"
+ALLOWED_MODELS = frozenset(
+    os.environ.get("ALLOWED_MODELS", "gemini-1.5-flash,gemini-1.5-pro,gemini-2.0-flash").split(","))
+
+PPTX_MIME = "application/vnd.openxmlformats-officedocument.presentationml.presentation"
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class Metrics:
+    """リクエスト数・処理時間（ヒストグラム）・処理中件数を Prometheus テキスト形式で出力する。"""
+
+    def __init__(self):
+        self.requests = defaultdict(int)                         # (path, status) -> 件数
+        self.latency = defaultdict(lambda: [0] * (len(LATENCY_BUCKETS) + 1))  # path -> バケット別件数
+        self.latency_sum = defaultdict(float)
+        self.in_flight = 0
+
+    def observe(self, path, status, seconds):
+        self.requests[(path, status)] += 1
+        buckets = self.latency[path]
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                buckets[i] += 1
+                break
+        else:
+            buckets[-1] += 1
+        self.latency_sum[path] += seconds
+
+    def render(self):
+        lines = [
+            "# HELP slide_http_requests_total HTTP requests by path and status.",
+            "# TYPE slide_http_requests_total counter",
+        ]
+        for (path, status), count in sorted(self.requests.items()):
+            lines.append(f'slide_http_requests_total{{path="{path}",status="{status}"}} {count}')
+        lines += [
+            "# HELP slide_http_request_duration_seconds HTTP request latency.",
+            "# TYPE slide_http_request_duration_seconds histogram",
+        ]
+        for path, buckets in sorted(self.latency.items()):
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + ("+Inf",), buckets):
+                cumulative += count
+                lines.append(f'slide_http_request_duration_seconds_bucket{{path="{path}",le="{bound}"}} {cumulative}')
+            lines.append(f'slide_http_request_duration_seconds_sum{{path="{path}"}} {self.latency_sum[path]:.6f}')
+            lines.append(f'slide_http_request_duration_seconds_count{{path="{path}"}} {cumulative}')
+        lines += [
+            "# HELP slide_http_requests_in_flight Requests currently being processed.",
+            "# TYPE slide_http_requests_in_flight gauge",
+            f"slide_http_requests_in_flight {self.in_flight}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _render_pptx(json_data, compression, compresslevel):
+    # 描画プロセスで実行する
+    buf = io.BytesIO()
+    save_presentation(build_a3_presentation(json_data), buf, compression, compresslevel)
+    return buf.getvalue()
+
+
+class SlideService:
+    """ASGI アプリケーション本体。描画はプロセスプール、AI 呼び出しはスレッドプールで行う。"""
+
+    def __init__(self, render_workers=RENDER_WORKERS):
+        self.render_workers = render_workers
+        self.render_pool = None
+        self.analyze_pool = None
+        self.pending = {}  # プール -> 受付済み（実行中＋待ち）の件数
+        self.max_pending = {}
+        self.metrics = Metrics()
+        self.routes = {
+            ("POST", "/render"): self.render,
+            ("POST", "/analyze"): self.analyze,
+            ("GET", "/metrics"): self.show_metrics,
+            ("GET", "/healthz"): self.healthz,
+        }
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        path = scope["path"]
+        start = time.perf_counter()
+        self.metrics.in_flight += 1
+        try:
+            handler = self.routes.get((scope["method"], path))
+            if handler is None:
+                raise HTTPError(404, "Not Found")
+            status, content_type, body, headers = await handler(scope, receive)
+        except HTTPError as e:
+            status, content_type, body, headers = e.status, "application/json", _json_bytes({"error": e.message}), []
+        except Exception as e:
+            status, content_type, body, headers = 500, "application/json", _json_bytes({"error": f"{type(e).__name__}: {e}"}), []
+        finally:
+            self.metrics.in_flight -= 1
+
+        await send({
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode())] + headers,
+        })
+        await send({"type": "http.response.body", "body": body})
+        if path in {p for _, p in self.routes}:
+            self.metrics.observe(path, status, time.perf_counter() - start)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    def startup(self):
+        self.render_pool = ProcessPoolExecutor(max_workers=self.render_workers)
+        self.analyze_pool = ThreadPoolExecutor(max_workers=ANALYZE_WORKERS, thread_name_prefix="analyze")
+        self.pending = {self.render_pool: 0, self.analyze_pool: 0}
+        self.max_pending = {self.render_pool: RENDER_MAX_PENDING, self.analyze_pool: ANALYZE_MAX_PENDING}
+        api_key = os.environ.get("GEMINI_API_KEY")
+        if api_key and os.environ.get("SLIDE_MODEL_BACKEND", "gemini") == "gemini":
+            import google.generativeai as genai
+            genai.configure(api_key=api_key)
+
+    def shutdown(self):
+        self.render_pool.shutdown(cancel_futures=True)
+        self.analyze_pool.shutdown(cancel_futures=True)
+
+    async def _run(self, pool, timeout, fn, *args):
+        """pool で fn を実行する。受付上限を超えたら 503、timeout 秒で 504 を返す。
+
+        timeout はプールの待ち時間も含む。待ち行列にある処理はタイムアウト時に取り消すが、
+        実行を始めた処理は止められないため最後まで動き続ける。その間も受付件数に数えるので、
+        タイムアウトが続いても実行中＋待ちの件数は max_pending を超えない。
+        """
+        if self.pending[pool] >= self.max_pending[pool]:
+            raise HTTPError(503, "Server is busy, retry later")
+        loop = asyncio.get_running_loop()
+        self.pending[pool] += 1
+        future = pool.submit(fn, *args)
+        future.add_done_callback(lambda _: loop.call_soon_threadsafe(self._release, pool))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            raise HTTPError(504, f"Timed out after {timeout:g}s")
+
+    def _release(self, pool):
+        self.pending[pool] -= 1
+
+    # --- Handlers ---
+    async def render(self, scope, receive):
+        data = await _read_json(receive)
+        query = parse_qs(scope.get("query_string", b"").decode())
+        compression = query.get("compression", ["deflate"])[0]
+        level = query.get("level", [None])[0]
+        try:
+            level = None if level is None else int(level)
+            check_compression(compression, level)
+        except ValueError as e:
+            raise HTTPError(400, str(e))
+
+        _check_slide_json(data)
+        doc = SlideDoc.from_json(data)
+        blob = await self._run(self.render_pool, RENDER_TIMEOUT_SEC, _render_pptx,
+                               data, compression, level)
+        return 200, PPTX_MIME, blob, [(b"x-slide-digest", doc.digest.encode())]
+
+    async def analyze(self, scope, receive):
+        data = await _read_json(receive)
+        if not isinstance(data, dict) or not data.get("topic"):
+            raise HTTPError(400, "topic is required")
+        box_count = data.get("box_count", "Auto")
+        if not isinstance(box_count, str) or ("Auto" not in box_count and not box_count.split("個")[0].isdigit()):
+            raise HTTPError(400, f"Invalid box_count: {box_count!r}")
+        model = data.get("model", DEFAULT_MODEL)
+        if not isinstance(model, str) or model not in ALLOWED_MODELS:
+            raise HTTPError(400, f"Unknown model: {model!r}")
+        result = await self._run(
+            self.analyze_pool, ANALYZE_TIMEOUT_SEC, ai_structure.analyze_and_structure,
+            data["topic"], data.get("overview", ""), box_count, model,
+        )
+        return 200, "application/json", _json_bytes(result), []
+
+    async def show_metrics(self, scope, receive):
+        return 200, "text/plain; version=0.0.4", self.metrics.render().encode(), []
+
+    async def healthz(self, scope, receive):
+        return 200, "application/json", _json_bytes({"status": "ok"}), []
+
+
+def _check_slide_json(data):
+    # 型の誤りを描画プロセスに渡す前に 400 にする（描画側の失敗は 500 のまま）
+    if not isinstance(data, dict):
+        raise HTTPError(400, "Invalid slide JSON: expected an object")
+    for key in ("theme", "department", "analysis"):
+        if not isinstance(data.get(key, ""), str):
+            raise HTTPError(400, f"Invalid slide JSON: {key} must be a string")
+    content = data.get("content", [])
+    if isinstance(content, dict):
+        # 旧形式（box1〜box8 → 本文）
+        if not all(isinstance(v, str) for v in content.values()):
+            raise HTTPError(400, "Invalid slide JSON: content values must be strings")
+        return
+    if not isinstance(content, list):
+        raise HTTPError(400, "Invalid slide JSON: content must be a list or an object")
+    for i, item in enumerate(content):
+        if not isinstance(item, dict):
+            raise HTTPError(400, f"Invalid slide JSON: content[{i}] must be an object")
+        for key in ("column", "label", "text"):
+            if not isinstance(item.get(key, ""), str):
+                raise HTTPError(400, f"Invalid slide JSON: content[{i}].{key} must be a string")
+        if not isinstance(item.get("layout_type") or "", str):
+            raise HTTPError(400, f"Invalid slide JSON: content[{i}].layout_type must be a string")
+
+
+async def _read_json(receive):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if len(body) > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        if not message.get("more_body"):
+            break
+    try:
+        return json.loads(body)
+    except ValueError as e:
+        raise HTTPError(400, f"Invalid JSON: {e}")
+
+
+def _json_bytes(data):
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+app = SlideService()
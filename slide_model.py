@@ -0,0 +1,105 @@
+"""
+スライド構成のドキュメントモデル。
+
+AI・エディタ・旧形式（box1〜box8 の辞書）から来るスライドJSONを一度だけ正規化し、
+以降は不変 (frozen) かつ __slots__ 付きのオブジェクトとして扱う。
+左右カラムへの振り分けと内容ハッシュは生成時に計算済み。
+"""
+import hashlib
+import json
+from dataclasses import dataclass, field, replace
+
+COLUMNS = ("left", "right")
+
+# 旧形式のキー → カラム / 見出し
+LEGACY_RIGHT_BOXES = ("box5", "box6", "box7", "box8")
+LEGACY_LABELS = (("background", "背景"), ("necessity", "課題"), ("plan", "施策"))
+
+
+@dataclass(frozen=True, slots=True)
+class SlideItem:
+    """1つのボックス（セクション）。"""
+    column: str
+    label: str
+    text: str
+    layout_type: str = "text"
+
+    def to_dict(self) -> dict:
+        return {"column": self.column, "label": self.label, "text": self.text, "layout_type": self.layout_type}
+
+
+@dataclass(frozen=True, slots=True)
+class SlideDoc:
+    """1枚のスライド。left / right はカラムごとのボックス（上から順）。"""
+    theme: str = "Untitled"
+    department: str = ""
+    analysis: str = ""
+    left: tuple[SlideItem, ...] = ()
+    right: tuple[SlideItem, ...] = ()
+    digest: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        canonical = json.dumps(self.to_dict(), ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+        object.__setattr__(self, "digest", hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).hexdigest())
+
+    @classmethod
+    def from_json(cls, json_data: "dict | SlideDoc") -> "SlideDoc":
+        """スライドJSON（リスト形式・旧 box1〜box8 形式）から正規化して生成する。"""
+        if isinstance(json_data, SlideDoc):
+            return json_data
+
+        content = json_data.get("content", [])
+        if isinstance(content, dict):
+            items = [_legacy_item(k, v) for k, v in content.items()]
+        else:
+            items = [SlideItem(column=c.get("column", ""), label=c.get("label", ""),
+                               text=c.get("text", ""), layout_type=c.get("layout_type") or "text")
+                     for c in content]
+
+        left = tuple(item for item in items if item.column == "left")
+        right = tuple(item for item in items if item.column == "right")
+        if not left and not right:
+            # Fallback for old format or unexpected json (カラム指定なし → 前半を左、後半を右)
+            half = len(items) // 2
+            left = tuple(replace(item, column="left") for item in items[:half])
+            right = tuple(replace(item, column="right") for item in items[half:])
+
+        return cls(theme=json_data.get("theme", "Untitled"), department=json_data.get("department", ""),
+                   analysis=json_data.get("analysis", ""), left=left, right=right)
+
+    @property
+    def items(self) -> tuple[SlideItem, ...]:
+        return self.left + self.right
+
+    def column(self, column: str) -> tuple[SlideItem, ...]:
+        return self.left if column == "left" else self.right
+
+    def update(self, **changes) -> "SlideDoc":
+        """変更があれば新しい SlideDoc を返す（変更がなければ self をそのまま返す）。"""
+        if all(getattr(self, k) == v for k, v in changes.items()):
+            return self
+        return replace(self, **changes)
+
+    def update_item(self, column: str, index: int, **changes) -> "SlideDoc":
+        """指定カラムの index 番目のボックスを更新する。変更がなければ self を返す。"""
+        items = self.column(column)
+        item = items[index]
+        if all(getattr(item, k) == v for k, v in changes.items()):
+            return self
+        new_items = items[:index] + (replace(item, **changes),) + items[index + 1:]
+        return replace(self, **{column: new_items})
+
+    def to_dict(self) -> dict:
+        """app.py / AI が扱うリスト形式のスライドJSONに戻す。"""
+        return {
+            "analysis": self.analysis,
+            "theme": self.theme,
+            "department": self.department,
+            "content": [item.to_dict() for item in self.items],
+        }
+
+
+def _legacy_item(key: str, text: str) -> SlideItem:
+    column = "right" if any(box in key for box in LEGACY_RIGHT_BOXES) else "left"
+    label = next((name for word, name in LEGACY_LABELS if word in key), "Section")
+    return SlideItem(column=column, label=label, text=text)
@@ -0,0 +1,216 @@
+"""
+スライドJSONを JSON Lines で流し込み、PPTX を一括生成するバッチ用パイプライン。
+
+入力は1行1スライド（create_a3_slide と同じJSON）。標準入力またはファイルから逐次読み込み、
+PPTX をディレクトリまたは zip に書き出し、入力1行ごとに結果を JSON Lines で出力する。
+処理中の件数は --max-inflight で上限を設けるため、入力サイズによらずメモリ使用量は一定。
+
+    cat specs.jsonl | python stream_slides.py --zip out.zip > status.jsonl
+    python stream_slides.py specs.jsonl --out-dir out/ -j 4
+"""
+import argparse
+import io
+import json
+import os
+import re
+import sys
+import zipfile
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from generate_slide import COMPRESSION_MODES, build_a3_presentation, check_compression, save_presentation
+from slide_model import SlideDoc
+
+# 重複検出のために描画結果（PPTXバイト列）を覚えておく件数（メモリを一定に保つため上限付き）
+DEDUP_CACHE_SIZE = 256
+
+
+def render_line(line_no: int, data: dict, digest: str, compression: str = "deflate",
+                compresslevel: int | None = None) -> tuple[dict, bytes | None]:
+    """1件分のスライドを描画し、(ステータス, PPTXバイト列) を返す（ワーカープロセスで実行）。"""
+    status = {"line": line_no, "digest": digest}
+    try:
+        buf = io.BytesIO()
+        save_presentation(build_a3_presentation(data), buf, compression, compresslevel)
+    except Exception as e:
+        status.update(status="error", error=f"{type(e).__name__}: {e}")
+        return status, None
+
+    status.update(status="ok", name=_output_name(line_no, data))
+    return status, buf.getvalue()
+
+
+def _done(status: dict) -> Future:
+    # 描画しない行（不正なJSON）も入力順に出力するため、完了済み Future として並べる
+    future = Future()
+    future.set_result((status, None))
+    return future
+
+
+def _output_name(line_no: int, data: dict) -> str:
+    # 入力に id があればファイル名に使う（パス区切り等は除去）
+    slide_id = str(data.get("id", "")) or f"{line_no:06d}"
+    return re.sub(r'[\\/:*?"<>|\s]', "_", slide_id) + ".pptx"
+
+
+class _Sink:
+    """出力先の共通処理。既に同じ名前がある場合は行番号を付けて別名にする。"""
+
+    def write(self, name: str, blob: bytes, line_no: int) -> str:
+        # 書き出し済みの名前は出力先自体に問い合わせる（名前を覚えておかないのでメモリは一定）
+        if self._exists(name):
+            stem, ext = os.path.splitext(name)
+            name = f"{stem}_{line_no:06d}{ext}"
+        return self._write(name, blob)
+
+    def close(self):
+        pass
+
+
+class DirSink(_Sink):
+    """PPTX をディレクトリに1ファイルずつ書き出す。"""
+
+    def __init__(self, out_dir: str):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _exists(self, name: str) -> bool:
+        return os.path.exists(os.path.join(self.out_dir, name))
+
+    def _write(self, name: str, blob: bytes) -> str:
+        path = os.path.join(self.out_dir, name)
+        with open(path, "wb") as f:
+            f.write(blob)
+        return path
+
+
+class ZipSink(_Sink):
+    """PPTX を1つの zip アーカイブにまとめる（PPTX 自体が圧縮済みのため無圧縮で格納）。"""
+
+    def __init__(self, zip_path: str):
+        self.zip = zipfile.ZipFile(zip_path, "w", compression=zipfile.ZIP_STORED)
+
+    def _exists(self, name: str) -> bool:
+        return name in self.zip.NameToInfo
+
+    def _write(self, name: str, blob: bytes) -> str:
+        self.zip.writestr(name, blob)
+        return name
+
+    def close(self):
+        self.zip.close()
+
+
+def run_pipeline(lines, sink, status_out, jobs: int | None = None, max_inflight: int | None = None,
+                 compression: str = "deflate", compresslevel: int | None = None) -> tuple[int, int]:
+    """入力行を逐次描画して sink に書き出す。戻り値は (成功件数, 失敗件数)。
+
+    読み込み → 描画 → 書き出しの間は未完了の描画が max_inflight 件に達すると
+    読み込みを止める（バックプレッシャー）。結果は入力順に書き出す。
+    内容が同一のスライド（SlideDoc.digest が一致）は再描画せず、最初の行の結果を
+    自分の名前で書き出す（ステータスの duplicate_of が最初の行）。最初の行が失敗していれば
+    重複行もエラーになる。これはデッキ単位の描画結果の再利用で、重複行も PPTX 全体を
+    そのまま書き出す。デッキをまたいだ同一パーツ（画像等）の共有はしない。
+    """
+    jobs = jobs or os.cpu_count() or 1
+    max_inflight = max_inflight or jobs * 2
+    ok = failed = 0
+    pending = deque()
+    inflight = {}          # digest -> 描画中の最初の行番号
+    results = OrderedDict()  # digest -> (最初の行番号, エラー or None, PPTXバイト列)
+
+    def resolve(item):
+        # 重複行は、入力順で先に書き出された最初の行の結果を使う
+        if isinstance(item, Future):
+            status, blob = item.result()
+            digest = status.get("digest")
+            if digest is not None and inflight.get(digest) == status["line"]:
+                del inflight[digest]
+                results[digest] = (status["line"], status.get("error"), blob)
+                if len(results) > DEDUP_CACHE_SIZE:
+                    results.popitem(last=False)
+            return status, blob
+
+        line_no, data, digest, first_line = item
+        if digest not in results:
+            # キャッシュから外れていれば描画し直す
+            return render_line(line_no, data, digest, compression, compresslevel)
+        results.move_to_end(digest)
+        _, error, blob = results[digest]
+        status = {"line": line_no, "digest": digest, "duplicate_of": first_line}
+        if error is not None:
+            status.update(status="error", error=error)
+            return status, None
+        status.update(status="ok", name=_output_name(line_no, data))
+        return status, blob
+
+    def drain_one():
+        nonlocal ok, failed
+        status, blob = resolve(pending.popleft())
+        if status["status"] == "error":
+            failed += 1
+        else:
+            status["file"] = sink.write(status.pop("name"), blob, status["line"])
+            status["bytes"] = len(blob)
+            ok += 1
+        status_out.write(json.dumps(status, ensure_ascii=False) + "\n")
+        status_out.flush()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for line_no, raw in enumerate(lines, 1):
+            if not raw.strip(): continue
+            if len(pending) >= max_inflight:
+                drain_one()
+            try:
+                data = json.loads(raw)
+                digest = SlideDoc.from_json(data).digest
+            except Exception as e:
+                pending.append(_done({"line": line_no, "status": "error", "error": f"{type(e).__name__}: {e}"}))
+                continue
+
+            first_line = inflight.get(digest) or (results[digest][0] if digest in results else None)
+            if first_line is not None:
+                pending.append((line_no, data, digest, first_line))
+                continue
+            inflight[digest] = line_no
+            pending.append(pool.submit(render_line, line_no, data, digest, compression, compresslevel))
+        while pending:
+            drain_one()
+    return ok, failed
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="JSON Lines からスライドを一括生成")
+    parser.add_argument("input", nargs="?", default="-", help="入力 JSONL（省略または - で標準入力）")
+    out = parser.add_mutually_exclusive_group(required=True)
+    out.add_argument("--out-dir", help="PPTX の出力ディレクトリ")
+    out.add_argument("--zip", help="PPTX をまとめる zip ファイル")
+    parser.add_argument("--status", help="ステータス JSONL の出力先（省略時は標準出力）")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(), help="描画プロセス数")
+    parser.add_argument("--max-inflight", type=int, help="同時に処理中とする最大件数（既定: jobs×2）")
+    parser.add_argument("--compression", choices=list(COMPRESSION_MODES), default="deflate",
+                        help="PPTX の zip 圧縮方式（store: 無圧縮・最速）")
+    parser.add_argument("--level", type=int, metavar="0-9", help="deflate の圧縮レベル")
+    args = parser.parse_args(argv)
+    try:
+        check_compression(args.compression, args.level)
+    except ValueError as e:
+        parser.error(str(e))
+
+    src = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    status_out = open(args.status, "w", encoding="utf-8") if args.status else sys.stdout
+    sink = ZipSink(args.zip) if args.zip else DirSink(args.out_dir)
+    try:
+        ok, failed = run_pipeline(src, sink, status_out, args.jobs, args.max_inflight,
+                                  args.compression, args.level)
+    finally:
+        sink.close()
+        if src is not sys.stdin: src.close()
+        if status_out is not sys.stdout: status_out.close()
+
+    print(f"Rendered: {ok} ok, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
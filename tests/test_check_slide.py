@@ -0,0 +1,65 @@
+import json
+
+from check_slide import _analyze_item, analyze_file, analyze_slide, main
+from slide_model import SlideItem
+
+
+def _kinds(issues):
+    return [(i["kind"], i["where"]) for i in issues]
+
+
+def test_long_title_is_too_small_and_overflows():
+    issues = analyze_slide({"theme": "あ" * 60, "content": []})
+    assert _kinds(issues) == [("font_below_min", "title"), ("overflow", "title")]
+    assert issues[0]["font_pt"] < issues[0]["min_pt"]
+    assert issues[1]["required_cm"] > issues[1]["available_cm"]
+
+
+def test_long_body_in_four_box_column_overflows():
+    content = [{"column": "left", "label": "背景", "text": "・" + "長い本文" * 200}]
+    content += [{"column": "left", "label": "x", "text": "a"}] * 3
+    issues = analyze_slide({"theme": "T", "content": content})
+    assert _kinds(issues) == [("overflow", "body")]
+    assert issues[0]["column"] == "left" and issues[0]["index"] == 0
+
+
+def test_flow_reports_font_and_each_step():
+    content = [{"column": "right", "label": "施策", "text": "\n".join(["手順" * 80] * 4), "layout_type": "flow_horizontal"}]
+    content += [{"column": "right", "label": "x", "text": "a"}] * 3
+    issues = analyze_slide({"theme": "T", "content": content})
+    assert _kinds(issues) == [("font_below_min", "flow")] + [("overflow", "flow")] * 4
+    assert [i["step"] for i in issues[1:]] == [0, 1, 2, 3]
+    assert {i["arrangement"] for i in issues[1:]} == {"horizontal"}
+
+
+def test_flow_falling_back_to_section_is_measured_as_body():
+    # 枠が狭すぎてフロー図を配置できない場合、描画と同じく通常セクションとして検査する
+    issues = _analyze_item(SlideItem("left", "", "・a\n・b", "flow"), 0, 0, 0.8, 10)
+    assert ("overflow", "body") in _kinds(issues)
+    assert all(i["where"] != "flow" for i in issues)
+
+
+def test_analyze_file_keeps_going_after_bad_input(tmp_path):
+    good = json.dumps({"theme": "OK", "content": []}, ensure_ascii=False).encode()
+    path = tmp_path / "decks.jsonl"
+    path.write_bytes(good + b"\n" + b"\xff\xfe broken\n" + b"\n" + good + b"\n")
+
+    reports = analyze_file(str(path))
+    assert [r["source"] for r in reports] == [f"{path}:1", f"{path}:2", f"{path}:4"]
+    assert [r["ok"] for r in reports] == [True, False, True]
+    assert reports[1]["error"].startswith("UnicodeDecodeError")
+
+    missing = analyze_file(str(tmp_path / "missing.json"))
+    assert len(missing) == 1 and not missing[0]["ok"] and missing[0]["error"].startswith("FileNotFoundError")
+
+
+def test_main_reports_every_deck(tmp_path):
+    (tmp_path / "a.json").write_text(json.dumps({"theme": "A", "content": []}), encoding="utf-8")
+    (tmp_path / "b.jsonl").write_bytes(b'{"theme": "B1"}\nnot json\n{"theme": "B3"}\n')
+    out = tmp_path / "report.jsonl"
+
+    assert main([str(tmp_path / "a.json"), str(tmp_path / "missing.json"), str(tmp_path / "b.jsonl"),
+                 "-o", str(out), "-j", "2"]) == 1
+    reports = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert [r.get("theme") for r in reports if r["ok"]] == ["A", "B1", "B3"]
+    assert len([r for r in reports if not r["ok"]]) == 2
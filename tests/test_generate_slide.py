@@ -0,0 +1,52 @@
+import io
+import zipfile
+
+import pytest
+
+from generate_slide import build_a3_presentation, save_presentation
+
+SAMPLE = {
+    "theme": "公用車EV化導入計画",
+    "department": "総務部",
+    "content": [
+        {"column": "left", "label": "背景", "text": "・**CO2削減**が急務である。"},
+        {"column": "right", "label": "施策", "text": "・調査\n・整備\n・導入", "layout_type": "flow_horizontal"},
+    ],
+}
+
+
+def _members(blob):
+    with zipfile.ZipFile(io.BytesIO(blob)) as z:
+        return [(info.filename, info.compress_type, z.read(info)) for info in z.infolist()]
+
+
+def test_save_presentation_deflate_matches_prs_save():
+    # python-pptx の内部APIに依存しているため、既定の保存結果とメンバー単位で一致することを確認する
+    prs = build_a3_presentation(SAMPLE)
+    expected, actual = io.BytesIO(), io.BytesIO()
+    prs.save(expected)
+    save_presentation(prs, actual, "deflate")
+    assert _members(actual.getvalue()) == _members(expected.getvalue())
+
+
+def test_save_presentation_store_keeps_contents():
+    prs = build_a3_presentation(SAMPLE)
+    deflated, stored = io.BytesIO(), io.BytesIO()
+    save_presentation(prs, deflated, "deflate", 9)
+    save_presentation(prs, stored, "store")
+    members = _members(stored.getvalue())
+    assert {c for _, c, _ in members} == {zipfile.ZIP_STORED}
+    assert [(n, b) for n, _, b in members] == [(n, b) for n, _, b in _members(deflated.getvalue())]
+
+
+def test_save_presentation_rejects_unknown_compression():
+    with pytest.raises(ValueError):
+        save_presentation(build_a3_presentation(SAMPLE), io.BytesIO(), "lzma")
+
+
+@pytest.mark.parametrize("level", [-1, 10, 12, "6", 1.5, True])
+def test_save_presentation_rejects_invalid_level_before_writing(tmp_path, level):
+    path = tmp_path / "out.pptx"
+    with pytest.raises(ValueError, match="compresslevel"):
+        save_presentation(build_a3_presentation(SAMPLE), str(path), "deflate", level)
+    assert not path.exists()
@@ -0,0 +1,41 @@
+from pptx.enum.shapes import MSO_SHAPE
+
+from generate_slide import FLOW_MAX_STEPS, column_slots, content_frame, plan_flow
+
+
+def _frame():
+    x, _, w, top, height = content_frame()
+    y, h = column_slots(3, top, height)[0]
+    return x, y, w, h
+
+
+def test_short_flow_is_horizontal():
+    plan = plan_flow(*_frame(), ["調査", "整備", "導入"])
+    assert (plan.arrangement, plan.rows, plan.cols) == ("horizontal", 1, 3)
+    assert [a[0] for a in plan.arrows] == [MSO_SHAPE.RIGHT_ARROW] * 2
+    assert len({round(b[1], 6) for b in plan.boxes}) == 1
+
+
+def test_long_flow_keeps_every_step():
+    steps = [f"ステップ{i}" for i in range(12)]
+    plan = plan_flow(*_frame(), steps, "flow_wrapped")
+    assert len(plan.boxes) == 12
+    assert len(plan.arrows) == 11
+    assert plan.cols <= FLOW_MAX_STEPS and plan.rows * plan.cols >= 12
+
+
+def test_wrapped_rows_snake():
+    plan = plan_flow(*_frame(), [str(i) for i in range(6)], "flow_wrapped")
+    assert plan.arrangement == "wrapped"
+    kinds = [a[0] for a in plan.arrows]
+    assert MSO_SHAPE.DOWN_ARROW in kinds and MSO_SHAPE.LEFT_ARROW in kinds
+    # 行の変わり目は真下に進む
+    i = kinds.index(MSO_SHAPE.DOWN_ARROW)
+    assert plan.boxes[i][0] == plan.boxes[i + 1][0]
+
+
+def test_vertical_and_empty():
+    x, y, w, h = _frame()
+    plan = plan_flow(x, y, w, h, ["a", "b"], "flow_vertical")
+    assert (plan.arrangement, plan.cols) == ("vertical", 1)
+    assert plan_flow(x, y, w, h, []) is None
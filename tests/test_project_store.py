@@ -0,0 +1,109 @@
+import pytest
+
+import project_store
+from project_store import ProjectStore, _apply, _diff
+from slide_model import SlideDoc
+
+SAMPLE = {
+    "theme": "公用車EV化導入計画",
+    "department": "総務部",
+    "content": [
+        {"column": "left", "label": "背景", "text": "・CO2削減"},
+        {"column": "left", "label": "課題", "text": "・初期費用"},
+        {"column": "right", "label": "施策", "text": "・調査\n・導入", "layout_type": "flow"},
+    ],
+}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ProjectStore(str(tmp_path / "projects.db"))
+
+
+def test_diff_apply_round_trip():
+    doc = SlideDoc.from_json(SAMPLE)
+    edited = doc.update(theme="新タイトル").update_item("right", 0, text="・調査\n・整備\n・導入")
+    events = _diff(doc, edited)
+    assert [key for key, _ in events] == ["meta", "right:0"]
+    for key, value in events:
+        doc = _apply(doc, key, value)
+    assert doc == edited
+    assert doc.digest == edited.digest
+
+
+def test_diff_replaces_doc_when_box_count_changes():
+    doc = SlideDoc.from_json(SAMPLE)
+    edited = doc.update(left=doc.left[:1])
+    assert _diff(doc, edited) == [("doc", edited.to_dict())]
+
+
+def test_save_skips_unchanged_doc(store):
+    doc = SlideDoc.from_json(SAMPLE)
+    project_id = store.create(doc)
+    assert store.save(project_id, doc) == 0
+    assert store.save(project_id, doc.update_item("left", 1, label="問題点")) == 1
+
+
+def test_save_unknown_project_raises(store):
+    with pytest.raises(KeyError):
+        store.save("missing", SlideDoc.from_json(SAMPLE))
+
+
+def test_replay_after_compaction(store):
+    doc = SlideDoc.from_json(SAMPLE)
+    project_id = store.create(doc)
+    for i in range(5):
+        doc = doc.update_item("left", 0, text=f"・CO2削減 {i}")
+        store.save(project_id, doc)
+    assert store.compact(min_events=3) == 1
+
+    # コンパクション後の追記も、スナップショットの上に積み上げて復元できる
+    doc = doc.update(department="財産管理課").update_item("right", 0, layout_type="flow_vertical")
+    store.save(project_id, doc)
+    assert store.compact(min_events=100) == 0
+
+    reopened = ProjectStore(store.path)
+    assert reopened.load(project_id) == doc
+    assert reopened.load(project_id).digest == doc.digest
+
+
+def test_last_saved_cache_is_bounded(store, monkeypatch):
+    monkeypatch.setattr(project_store, "LAST_SAVED_CACHE_SIZE", 2)
+    doc = SlideDoc.from_json(SAMPLE)
+    ids = [store.create(doc) for _ in range(3)]
+    assert list(store._last_saved) == ids[1:]
+
+    # キャッシュから捨てたプロジェクトも DB から復元して差分保存できる
+    edited = doc.update(theme="更新")
+    assert store.save(ids[0], edited) == 1
+    assert store.load(ids[0]) == edited
+    assert len(store._last_saved) == 2
+
+
+def test_recent_lists_only_given_projects(store):
+    doc = SlideDoc.from_json(SAMPLE)
+    mine = [store.create(doc.update(theme=f"自分の下書き{i}")) for i in range(2)]
+    store.create(doc.update(theme="他の利用者の下書き"))
+
+    assert store.recent([]) == []
+    assert [row[:2] for row in store.recent(mine)] == [(mine[1], "自分の下書き1"), (mine[0], "自分の下書き0")]
+    assert len(store.recent(mine, limit=1)) == 1
+
+
+def test_compact_deletes_expired_projects(store):
+    doc = SlideDoc.from_json(SAMPLE)
+    old, fresh = store.create(doc), store.create(doc)
+    store.save(old, doc.update(theme="古い"))
+    store.compact(min_events=1)
+    store._conn.execute("UPDATE projects SET updated_at = updated_at - 31 * 86400 WHERE id = ?", (old,))
+
+    store.compact(retention_days=None)
+    assert store.load(old) is not None
+
+    store.compact(retention_days=30)
+    assert store.load(old) is None
+    assert store.load(fresh) == doc
+    for table in ("events", "snapshots"):
+        assert store._conn.execute(f"SELECT COUNT(*) FROM {table} WHERE project_id = ?", (old,)).fetchone()[0] == 0
+    with pytest.raises(KeyError):
+        store.save(old, doc.update(theme="更新"))
@@ -0,0 +1,140 @@
+import asyncio
+import io
+import json
+import time
+import zipfile
+
+import pytest
+
+import ai_structure
+import server
+from server import HTTPError, SlideService
+from slide_model import SlideDoc
+
+SLIDE = {
+    "theme": "公用車EV化導入計画",
+    "department": "総務部",
+    "content": [{"column": "left", "label": "背景", "text": "・CO2削減"}],
+}
+
+
+@pytest.fixture(autouse=True)
+def stub_backend(monkeypatch):
+    monkeypatch.setenv("SLIDE_MODEL_BACKEND", "stub")
+    ai_structure.get_model.cache_clear()
+    yield
+    ai_structure.get_model.cache_clear()
+
+
+@pytest.fixture
+def app():
+    app = SlideService(render_workers=1)
+    app.startup()
+    yield app
+    app.shutdown()
+
+
+async def _call(app, method, path, body=b"", query=b""):
+    # ASGI アプリとして直接呼び出し、(ステータス, ヘッダ, 本文) を返す
+    messages = [{"type": "http.request", "body": body}]
+    response = {}
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = dict(message["headers"])
+        else:
+            response["body"] = message["body"]
+
+    await app({"type": "http", "method": method, "path": path, "query_string": query}, receive, send)
+    return response["status"], response["headers"], response["body"]
+
+
+def call(app, method, path, data=None, query=b""):
+    body = data if isinstance(data, bytes) else json.dumps(data, ensure_ascii=False).encode()
+    return asyncio.run(_call(app, method, path, body, query))
+
+
+def test_analyze_returns_stub_structure(app):
+    status, headers, body = call(app, "POST", "/analyze", {"topic": "EV化", "box_count": "4個"})
+    assert status == 200
+    assert json.loads(body) == ai_structure.dummy_structure("EV化")
+
+
+def test_render_returns_pptx_with_digest(app):
+    status, headers, body = call(app, "POST", "/render", SLIDE, query=b"compression=store&level=0")
+    assert status == 200
+    assert headers[b"content-type"] == server.PPTX_MIME.encode()
+    assert headers[b"x-slide-digest"] == SlideDoc.from_json(SLIDE).digest.encode()
+    with zipfile.ZipFile(io.BytesIO(body)) as z:
+        assert "ppt/presentation.xml" in z.namelist()
+
+
+@pytest.mark.parametrize("path, data, query", [
+    ("/analyze", {"topic": "x", "box_count": 4}, b""),
+    ("/analyze", {"topic": "x", "box_count": "たくさん"}, b""),
+    ("/analyze", {"topic": "x", "model": "other-model"}, b""),
+    ("/analyze", {"topic": "x", "model": ["gemini-1.5-flash"]}, b""),
+    ("/analyze", {"overview": "topic なし"}, b""),
+    ("/render", SLIDE, b"level=12"),
+    ("/render", SLIDE, b"level=high"),
+    ("/render", SLIDE, b"compression=lzma"),
+    ("/render", {"theme": None}, b""),
+    ("/render", {"content": [{"column": "left", "text": 5}]}, b""),
+    ("/render", {"content": ["text"]}, b""),
+    ("/render", {"content": "text"}, b""),
+    ("/render", {"content": {"box1_background": 1}}, b""),
+    ("/render", [SLIDE], b""),
+    ("/render", b"{broken", b""),
+])
+def test_bad_request(app, path, data, query):
+    status, _, body = call(app, "POST", path, data, query)
+    assert status == 400, body
+    assert "error" in json.loads(body)
+
+
+def test_render_accepts_legacy_boxes(app):
+    status, _, _ = call(app, "POST", "/render", {"theme": "T", "content": {"box1_background": "・a"}})
+    assert status == 200
+
+
+def test_oversized_body(app):
+    status, _, _ = call(app, "POST", "/render", b" " * (server.MAX_BODY_BYTES + 1))
+    assert status == 413
+
+
+def test_rejects_when_pool_is_saturated(app):
+    app.max_pending[app.analyze_pool] = 0
+    status, _, body = call(app, "POST", "/analyze", {"topic": "x"})
+    assert status == 503
+
+
+def test_timeout_keeps_running_job_pending(app):
+    async def scenario():
+        with pytest.raises(HTTPError) as e:
+            await app._run(app.analyze_pool, 0.05, time.sleep, 0.3)
+        assert e.value.status == 504
+        # 実行を始めた処理は止められないため、終わるまで受付件数に数える
+        assert app.pending[app.analyze_pool] == 1
+        await asyncio.sleep(0.4)
+        assert app.pending[app.analyze_pool] == 0
+
+    asyncio.run(scenario())
+
+
+def test_metrics_counts_requests(app):
+    call(app, "POST", "/analyze", {"topic": "x"})
+    call(app, "POST", "/analyze", {"topic": "x", "box_count": 4})
+    call(app, "GET", "/healthz")
+    call(app, "GET", "/unknown")
+    status, _, body = call(app, "GET", "/metrics")
+    text = body.decode()
+    assert status == 200
+    assert 'slide_http_requests_total{path="/analyze",status="200"} 1' in text
+    assert 'slide_http_requests_total{path="/analyze",status="400"} 1' in text
+    assert 'slide_http_requests_total{path="/healthz",status="200"} 1' in text
+    assert "/unknown" not in text
+    assert 'slide_http_request_duration_seconds_count{path="/analyze"} 2' in text
@@ -0,0 +1,39 @@
+from slide_model import SlideDoc, SlideItem
+
+
+def test_from_json_splits_columns():
+    doc = SlideDoc.from_json({"theme": "T", "content": [
+        {"column": "right", "label": "B", "text": "b", "layout_type": None},
+        {"column": "left", "label": "A", "text": "a"},
+    ]})
+    assert doc.left == (SlideItem("left", "A", "a"),)
+    assert doc.right == (SlideItem("right", "B", "b", "text"),)
+
+
+def test_from_json_legacy_boxes():
+    doc = SlideDoc.from_json({"content": {"box1_background": "x", "box5_plan": "y"}})
+    assert doc.theme == "Untitled"
+    assert [(i.column, i.label, i.text) for i in doc.items] == [("left", "背景", "x"), ("right", "施策", "y")]
+
+
+def test_from_json_without_columns_splits_in_half():
+    doc = SlideDoc.from_json({"content": [{"label": str(i), "text": ""} for i in range(5)]})
+    assert [i.label for i in doc.left] == ["0", "1"]
+    assert [i.label for i in doc.right] == ["2", "3", "4"]
+    assert {i.column for i in doc.right} == {"right"}
+
+
+def test_round_trip_and_digest():
+    doc = SlideDoc.from_json({"theme": "T", "content": [{"column": "left", "label": "A", "text": "a"}]})
+    assert SlideDoc.from_json(doc) is doc
+    assert SlideDoc.from_json(doc.to_dict()) == doc
+    assert SlideDoc.from_json(doc.to_dict()).digest == doc.digest
+    assert doc.update(theme="U").digest != doc.digest
+
+
+def test_update_without_changes_returns_self():
+    doc = SlideDoc.from_json({"theme": "T", "content": [{"column": "left", "label": "A", "text": "a"}]})
+    assert doc.update(theme="T") is doc
+    assert doc.update_item("left", 0, text="a") is doc
+    edited = doc.update_item("left", 0, text="b")
+    assert edited is not doc and edited.left[0].text == "b" and doc.left[0].text == "a"
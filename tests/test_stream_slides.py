@@ -0,0 +1,81 @@
+import io
+import json
+import zipfile
+
+import pytest
+
+import stream_slides
+from stream_slides import DirSink, ZipSink, run_pipeline
+
+
+def _slide(theme, **extra):
+    return json.dumps({"theme": theme, "content": [{"column": "left", "label": "A", "text": "・a"}], **extra},
+                      ensure_ascii=False)
+
+
+def _run(lines, sink):
+    out = io.StringIO()
+    ok, failed = run_pipeline(lines, sink, out, jobs=2, max_inflight=2, compression="store")
+    sink.close()
+    return ok, failed, [json.loads(line) for line in out.getvalue().splitlines()]
+
+
+def test_outputs_in_input_order_and_reports_bad_lines(tmp_path):
+    lines = [_slide(f"T{i}") for i in range(6)]
+    lines[1:1] = ["{broken", "[1, 2]", '"text"']
+    lines.append("   ")
+    ok, failed, statuses = _run(lines, DirSink(str(tmp_path)))
+
+    assert (ok, failed) == (6, 3)
+    assert [s["line"] for s in statuses] == list(range(1, 10))
+    assert [s["status"] for s in statuses[1:4]] == ["error"] * 3
+    assert statuses[1]["error"].startswith("JSONDecodeError")
+    assert sorted(p.name for p in tmp_path.iterdir()) == [f"{n:06d}.pptx" for n in (1, 5, 6, 7, 8, 9)]
+
+
+def test_duplicate_ids_get_line_suffix(tmp_path):
+    lines = [_slide("A", id="doc"), _slide("B", id="doc"), _slide("C", id="doc")]
+    _, _, statuses = _run(lines, DirSink(str(tmp_path)))
+    assert [s["file"] for s in statuses] == [str(tmp_path / n) for n in ("doc.pptx", "doc_000002.pptx", "doc_000003.pptx")]
+
+
+def test_duplicate_digests_reuse_first_result(tmp_path):
+    broken = json.dumps({"theme": "X", "content": [{"column": "left", "label": "A", "text": None}]})
+    lines = [_slide("A", id="a"), _slide("A", id="b"), broken, broken]
+    ok, failed, statuses = _run(lines, DirSink(str(tmp_path)))
+
+    assert (ok, failed) == (2, 2)
+    assert "duplicate_of" not in statuses[0]
+    assert statuses[1]["duplicate_of"] == 1 and statuses[1]["digest"] == statuses[0]["digest"]
+    assert (tmp_path / "a.pptx").read_bytes() == (tmp_path / "b.pptx").read_bytes()
+    assert statuses[3]["duplicate_of"] == 3
+    assert statuses[3]["status"] == "error" and statuses[3]["error"] == statuses[2]["error"]
+
+
+def test_duplicate_after_cache_eviction_is_rendered_again(tmp_path, monkeypatch):
+    monkeypatch.setattr(stream_slides, "DEDUP_CACHE_SIZE", 0)
+    lines = [_slide("A", id="a"), _slide("B"), _slide("C"), _slide("A", id="b")]
+    ok, _, statuses = _run(lines, DirSink(str(tmp_path)))
+    assert ok == 4
+    assert "duplicate_of" not in statuses[3]
+    assert (tmp_path / "b.pptx").exists()
+
+
+def test_zip_sink_member_names(tmp_path):
+    path = tmp_path / "out.zip"
+    lines = [_slide("A", id="x/y"), _slide("B", id="x/y"), _slide("A")]
+    ok, _, statuses = _run(lines, ZipSink(str(path)))
+    assert ok == 3
+    with zipfile.ZipFile(path) as z:
+        assert z.namelist() == ["x_y.pptx", "x_y_000002.pptx", "000003.pptx"]
+        assert {i.compress_type for i in z.infolist()} == {zipfile.ZIP_STORED}
+    assert [s["file"] for s in statuses] == ["x_y.pptx", "x_y_000002.pptx", "000003.pptx"]
+
+
+@pytest.mark.parametrize("sink_cls", [DirSink, ZipSink])
+def test_sink_renames_existing_name(tmp_path, sink_cls):
+    sink = sink_cls(str(tmp_path / ("out.zip" if sink_cls is ZipSink else "out")))
+    first = sink.write("a.pptx", b"1", 1)
+    second = sink.write("a.pptx", b"2", 7)
+    sink.close()
+    assert first.endswith("a.pptx") and second.endswith("a_000007.pptx")
@@ -22,6 +22,12 @@ test_data = {
             "text": "・ステップ1: 企画\n・ステップ2: 開発\n・ステップ3: テスト\n・ステップ4: リリース",
             "layout_type": "flow_horizontal"
         },
+        {
+            "column": "left",
+            "label": "🔁 05. 年間スケジュール (Flow - Wrapped)",
+            "text": "・4月: 計画策定\n・5月: 予算要求\n・6月: 業者選定\n・7月: 契約\n・8月: 設備工事\n・9月: 試行運用\n・10月: 本格運用\n・3月: 効果検証",
+            "layout_type": "flow"
+        },
         {
             "column": "right",
             "label": "✅ 04. 期待効果 (Flow - Fallback Test)",